@@ -38,73 +38,112 @@ This script lets you search Amazon for products using a remote Playwright browse
 
 3️⃣ The script will connect to the remote browser and hosted LLM to perform
    the search and print structured results in the terminal.
+
+----------------------------------------
+📌 Batch Mode
+----------------------------------------
+Run many searches at once, one keyword set per line (or JSON objects with
+"keywords" and an optional "id"), from a file or from stdin:
+
+    python Browser-Use-Remote.py --batch tasks.txt --concurrency 8 --task-timeout 180
+    cat tasks.txt | python Browser-Use-Remote.py --batch - --output results.jsonl
+
+Up to ``--concurrency`` agents run at once, each on a remote BrowserSession
+that is provisioned on first use and reused by later tasks. Each task's
+ProductSearchResults is appended to the ``--output`` JSONL file as soon as it
+finishes. With ``--stub-llm`` a local stub answers instead of Azure OpenAI, so
+throughput can be measured without an LLM deployment.
+
+----------------------------------------
+📌 LLM Response Cache
+----------------------------------------
+With ``--llm-cache`` every agent step is looked up in a disk cache keyed on
+the normalized prompt and the page state first (see llm_cache.py), so
+re-runs and retries of the same search skip the LLM round trip:
+
+    python Browser-Use-Remote.py --batch tasks.txt --llm-cache .llm_cache --llm-cache-mb 256
 """
 
+import argparse
 import asyncio
+import json
 import os
-from pydantic import BaseModel
-from dotenv import load_dotenv
-from browser_use import Agent
-from browser_use.llm import AzureChatOpenAI
-from browser_use.browser.session import BrowserSession
-from browser_use.browser.profile import BrowserProfile
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Import the shared module
-from playwright_service_client import get_cdp_endpoint
+import sys
+import time
+from typing import TYPE_CHECKING
+
+# Import the shared module (settings and .env are loaded on first use)
+from playwright_service_client import get_cdp_endpoint, get_config
+from playwright_service_client.session_timings import _percentile
+
+# browser_use and pydantic are imported only once a search actually starts,
+# so a missing setting is reported without waiting for them to load
+if TYPE_CHECKING:
+    from browser_use import Agent
+    from browser_use.browser.session import BrowserSession
+
+SERVICE_SETTINGS = (
+    "PLAYWRIGHT_SERVICE_URL",
+    "PLAYWRIGHT_SERVICE_ACCESS_TOKEN",
+)
+LLM_SETTINGS = (
+    "AZURE_OPENAI_API_KEY",
+    "AZURE_OPENAI_ENDPOINT",
+    "AZURE_OPENAI_API_VERSION",
+)
+
+
+def missing_settings(llm: bool = True) -> list[str]:
+    """Names of required environment variables that are not set (``llm=False``: service only)."""
+    get_config()  # loads .env into the environment
+    required = SERVICE_SETTINGS + LLM_SETTINGS if llm else SERVICE_SETTINGS
+    return [name for name in required if not os.getenv(name)]
 
 
 # --- Azure OpenAI Setup ---
 def get_llm():
     """Initialize the hosted Azure OpenAI LLM."""
-    return AzureChatOpenAI(
-        model_name="gpt-35-turbo",
-        openai_api_key=os.environ["AZURE_OPENAI_API_KEY"],
+    from browser_use.llm import ChatAzureOpenAI
+    
+    return ChatAzureOpenAI(
+        model="gpt-35-turbo",
+        api_key=os.environ["AZURE_OPENAI_API_KEY"],
         azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        deployment_name="gpt-35-turbo",
-        max_tokens=3000,
+        azure_deployment="gpt-35-turbo",
+        max_completion_tokens=3000,
         api_version=os.environ["AZURE_OPENAI_API_VERSION"],
     )
 
 
 # --- Remote Playwright Browser ---
-async def create_remote_browser_session() -> BrowserSession:
+async def create_remote_browser_session(**profile_options) -> "BrowserSession":
     """
     Create a remote Playwright browser session.
     Returns a BrowserSession configured for browser-use.
+
+    Args:
+        profile_options: Passed to BrowserProfile, e.g. ``keep_alive=True``
+            to reuse the session for several agents
     """
+    from browser_use.browser.session import BrowserSession
+    from browser_use.browser.profile import BrowserProfile
+    
+    # browser-use speaks CDP directly, so no Playwright driver is started here;
+    # scripts mixing both should connect Playwright through get_playwright()
     cdp_url = await get_cdp_endpoint()
     print(f"🔗 Connected to Playwright Service")
     
-    profile = BrowserProfile(cdp_url=cdp_url)
+    profile = BrowserProfile(cdp_url=cdp_url, **profile_options)
     return BrowserSession(browser_profile=profile)
 
 
-# --- Data Models ---
-class Product(BaseModel):
-    name: str
-    price: str
-    rating: str | None = None
-    reviews: str | None = None
-    url: str
-
-
-class ProductSearchResults(BaseModel):
-    items: list[Product] = []
-
-
 # --- Amazon Search Function ---
-async def search_amazon_remote(keywords: str = 'wireless mouse'):
-    """Search Amazon using remote browser + hosted Azure OpenAI LLM"""
-    print(f"🎯 Searching Amazon for: {keywords}")
-    print("🔧 Using: Remote Playwright Browser + Azure OpenAI LLM")
+def search_agent(keywords: str, browser_session: "BrowserSession", llm, **agent_options) -> "Agent":
+    """The agent that searches Amazon for ``keywords`` and returns ProductSearchResults."""
+    from browser_use import Agent
+    from product_models import ProductSearchResults
 
-    browser_session = await create_remote_browser_session()
-    llm = get_llm()
-
-    agent = Agent(
+    return Agent(
         task=f"""
         Go to Amazon (https://www.amazon.com) and search for "{keywords}".
         Collect the top 5 product results.
@@ -119,23 +158,180 @@ async def search_amazon_remote(keywords: str = 'wireless mouse'):
         llm=llm,
         browser_session=browser_session,
         output_model_schema=ProductSearchResults,
+        **agent_options,
     )
 
+
+async def search_amazon_remote(keywords: str = 'wireless mouse', llm=None):
+    """Search Amazon using remote browser + hosted Azure OpenAI LLM (or ``llm``)"""
+    print(f"🎯 Searching Amazon for: {keywords}")
+    print("🔧 Using: Remote Playwright Browser + Azure OpenAI LLM")
+
+    browser_session = await create_remote_browser_session()
+    agent = search_agent(keywords, browser_session, llm or get_llm())
+
     print("🎯 Starting Amazon search...")
     result = await agent.run()
     print("✅ Search completed successfully!")
     return result
 
 
+# --- Batch Mode ---
+def read_tasks(source: str) -> list[dict]:
+    """
+    Read batch tasks from a file, or from stdin when ``source`` is "-".
+
+    Each non-empty line is either plain keywords or a JSON object with
+    "keywords" and an optional "id" (default: the line number); lines
+    starting with # are skipped.
+
+    Raises:
+        ValueError: A line is not valid JSON or has no keywords (names the line)
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    tasks = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                task = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{source}:{number}: invalid JSON: {e}") from None
+        else:
+            task = {"keywords": line}
+        if not isinstance(task, dict) or not isinstance(task.get("keywords"), str) or not task["keywords"].strip():
+            raise ValueError(f'{source}:{number}: expected keywords or a JSON object with a "keywords" string')
+        task["id"] = str(task.get("id", number))
+        tasks.append(task)
+    return tasks
+
+
+async def run_batch(tasks: list[dict], output: str, llm, concurrency: int, task_timeout: float) -> dict:
+    """
+    Run one search agent per task and stream the results to ``output`` (JSONL).
+
+    ``concurrency`` workers each own one remote BrowserSession, provisioned on
+    first use and reused for the worker's next task, so at most
+    ``concurrency`` agents and sessions exist at once. A task that fails or
+    exceeds ``task_timeout`` seconds is written as an error and its session
+    is replaced, since the browser may be left mid-navigation.
+
+    Returns counts: tasks, ok, failed, timeouts, sessions.
+    """
+    queue: asyncio.Queue[dict] = asyncio.Queue()
+    for task in tasks:
+        queue.put_nowait(task)
+    stats = {"tasks": len(tasks), "ok": 0, "failed": 0, "timeouts": 0, "sessions": 0}
+    durations: list[float] = []
+    start = time.perf_counter()
+
+    async def kill(session: "BrowserSession") -> None:
+        try:
+            await session.kill()
+        except Exception:
+            pass
+
+    with open(output, "w", encoding="utf-8") as out:
+
+        async def worker() -> None:
+            session = None
+            try:
+                while not queue.empty():
+                    task = queue.get_nowait()
+                    task_start = time.perf_counter()
+                    record = {"id": task.get("id"), "keywords": task.get("keywords"), "ok": False, "results": None, "error": None}
+                    try:
+                        if session is None:
+                            session = await create_remote_browser_session(keep_alive=True)
+                            stats["sessions"] += 1
+                        agent = search_agent(record["keywords"], session, llm, use_judge=False)
+                        result = await asyncio.wait_for(agent.run(), task_timeout)
+                        if result and result.structured_output:
+                            record["ok"] = True
+                            record["results"] = result.structured_output.model_dump()
+                        else:
+                            record["error"] = "No structured output"
+                    except asyncio.TimeoutError:
+                        stats["timeouts"] += 1
+                        record["error"] = f"Timed out after {task_timeout:g}s"
+                    except Exception as e:
+                        record["error"] = f"{type(e).__name__}: {e}"
+                    if record["error"] is not None and session is not None:
+                        await kill(session)
+                        session = None
+
+                    record["seconds"] = round(time.perf_counter() - task_start, 2)
+                    durations.append(record["seconds"])
+                    stats["ok" if record["ok"] else "failed"] += 1
+                    # One line per finished task, flushed so results survive an interrupted run
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    icon = "✅" if record["ok"] else "❌"
+                    print(f"{icon} [{stats['ok'] + stats['failed']}/{stats['tasks']}] {record['keywords']} "
+                          f"({record['seconds']:.1f}s){'' if record['ok'] else ': ' + record['error']}")
+            finally:
+                if session is not None:
+                    await kill(session)
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(tasks)))))
+
+    wall = time.perf_counter() - start
+    durations.sort()
+    print(f"\n{'=' * 50}")
+    print(f"📊 {stats['ok']}/{stats['tasks']} tasks succeeded ({stats['timeouts']} timed out) "
+          f"on {stats['sessions']} sessions in {wall:.1f}s")
+    if durations:
+        print(f"   {len(durations) / wall * 60:.1f} tasks/min, per task p50 {_percentile(durations, 50):.1f}s, "
+              f"p95 {_percentile(durations, 95):.1f}s")
+    print(f"   Results: {output}")
+    return stats
+
+
 # --- Main ---
-async def main():
+async def main(args: argparse.Namespace):
     print("🛒 Amazon Product Search with Browser-Use + Azure OpenAI")
     print("=" * 50)
     
+    missing = missing_settings(llm=not args.stub_llm)
+    if missing:
+        print(f"❌ Missing environment variables: {', '.join(missing)} (see .env.example)")
+        return
+    
+    if args.stub_llm:
+        from stub_llm import StubChatModel
+        llm = StubChatModel(latency=args.stub_latency)
+    else:
+        llm = get_llm()
+    if args.llm_cache:
+        from llm_cache import CachedChatModel
+        llm = CachedChatModel(llm, args.llm_cache, max_bytes=args.llm_cache_mb * 1024 * 1024)
+    
+    if args.batch:
+        try:
+            tasks = read_tasks(args.batch)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            return
+        concurrency = args.concurrency or get_config().max_parallel
+        print(f"📋 {len(tasks)} tasks, {concurrency} at once, {args.task_timeout:g}s timeout each")
+        try:
+            await run_batch(tasks, args.output, llm, concurrency, args.task_timeout)
+        finally:
+            if args.llm_cache:
+                llm.report()
+        return
+    
     keywords = input('Enter product keywords (default "wireless mouse"): ').strip() or 'wireless mouse'
 
     try:
-        result = await search_amazon_remote(keywords)
+        result = await search_amazon_remote(keywords, llm)
 
         if result and result.structured_output:
             products = result.structured_output
@@ -155,6 +351,19 @@ async def main():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+    if args.llm_cache:
+        llm.report()
+
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Search Amazon with Browser-Use on Microsoft Playwright Service")
+    parser.add_argument("--batch", metavar="FILE", help='Run every task in FILE ("-" for stdin) instead of prompting')
+    parser.add_argument("--output", default="results.jsonl", help="JSON lines file batch results are streamed to")
+    parser.add_argument("--concurrency", type=int, help="Agents and remote sessions at once (default: PLAYWRIGHT_SERVICE_MAX_PARALLEL or 4)")
+    parser.add_argument("--task-timeout", type=float, default=300, help="Seconds a batch task may take (default: 300)")
+    parser.add_argument("--stub-llm", action="store_true", help="Answer with a local stub model instead of Azure OpenAI")
+    parser.add_argument("--stub-latency", type=float, default=1.0, help="Seconds each stub model call takes (default: 1)")
+    parser.add_argument("--llm-cache", nargs="?", const=".llm_cache", metavar="DIR",
+                        help="Answer repeated agent steps from a disk cache in DIR (default: .llm_cache)")
+    parser.add_argument("--llm-cache-mb", type=int, default=128, help="Cache size before the least recently used entries are evicted (default: 128)")
+    asyncio.run(main(parser.parse_args()))
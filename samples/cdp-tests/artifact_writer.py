@@ -0,0 +1,158 @@
+"""
+Artifact Writer - Microsoft Playwright Service
+
+Write screenshots and other binary artifacts off the event loop.
+
+----------------------------------------
+📌 Why
+----------------------------------------
+Under high concurrency, dozens of multi-megabyte screenshots can sit in memory
+at once, and writing them with ``page.screenshot(path=...)`` blocks the event
+loop. ArtifactWriter hands the bytes to a small thread pool, caps how many
+bytes may be waiting to be written (callers wait when the budget is used up),
+and writes identical images only once (by SHA-256 of the content).
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    from artifact_writer import ArtifactWriter
+
+    async with ArtifactWriter("test-results/screenshots") as artifacts:
+        path = await artifacts.capture(page, "home.png")
+        # Smaller files: JPEG at CSS pixel scale
+        path = await artifacts.capture(page, "home.jpg", jpeg_quality=70)
+"""
+
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+
+class ArtifactWriter:
+    """
+    Bounded background writer for screenshot bytes.
+
+    Args:
+        directory: Where artifacts are written (created if missing)
+        max_pending_bytes: Memory budget for bytes queued but not yet on disk
+        max_workers: Writer threads
+        jpeg_quality: Default JPEG quality for ``capture()`` (None = PNG)
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = "test-results/screenshots",
+        max_pending_bytes: int = 64 * 1024 * 1024,
+        max_workers: int = 2,
+        jpeg_quality: int | None = None,
+    ):
+        self.directory = Path(directory)
+        self.max_pending_bytes = max_pending_bytes
+        self.jpeg_quality = jpeg_quality
+        self.stats = {"written": 0, "deduplicated": 0, "bytes_written": 0, "backpressure_waits": 0}
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._by_digest: dict[str, Path] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._pending_bytes = 0
+        self._space: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def __aenter__(self) -> "ArtifactWriter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def capture(
+        self,
+        page: "Page",
+        name: str,
+        full_page: bool = False,
+        jpeg_quality: int | None = None,
+    ) -> Path:
+        """
+        Take a screenshot and queue it for writing.
+
+        Screenshots are taken at CSS pixel scale; with ``jpeg_quality`` they are
+        JPEG-encoded by the browser, which is usually several times smaller.
+        """
+        quality = jpeg_quality if jpeg_quality is not None else self.jpeg_quality
+        options = {"full_page": full_page, "scale": "css"}
+        if quality is not None:
+            options.update(type="jpeg", quality=quality)
+            name = str(Path(name).with_suffix(".jpg"))
+        data = await page.screenshot(**options)
+        return await self.write(name, data)
+
+    async def write(self, name: str, data: bytes) -> Path:
+        """
+        Queue ``data`` to be written as ``name`` and return its path.
+
+        Waits while the memory budget is exhausted. Content already written
+        under another name is not written again; that earlier path is returned.
+        Content still queued is written again, so a failed write never leaves
+        duplicates pointing at a missing file.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._by_digest:
+            self.stats["deduplicated"] += 1
+            return self._by_digest[digest]
+
+        path = self.directory / name
+        size = len(data)
+
+        space = self._condition()
+        async with space:
+            if self._pending_bytes and self._pending_bytes + size > self.max_pending_bytes:
+                self.stats["backpressure_waits"] += 1
+                # A single oversized artifact is still allowed once the queue drains
+                await space.wait_for(
+                    lambda: not self._pending_bytes or self._pending_bytes + size <= self.max_pending_bytes
+                )
+            self._pending_bytes += size
+
+        task = asyncio.create_task(self._write(path, data, size, digest))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return path
+
+    async def flush(self) -> None:
+        """Wait until every queued artifact is on disk."""
+        await asyncio.gather(*self._tasks)
+
+    async def close(self) -> None:
+        """Flush and stop the writer threads."""
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one event loop; recreate for a new one
+        loop = asyncio.get_running_loop()
+        if self._space is None or self._loop is not loop:
+            self._space = asyncio.Condition()
+            self._loop = loop
+        return self._space
+
+    async def _write(self, path: Path, data: bytes, size: int, digest: str) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write_file, path, data)
+            # Only content that is on disk can be deduplicated against
+            self._by_digest.setdefault(digest, path)
+            self.stats["written"] += 1
+            self.stats["bytes_written"] += size
+        finally:
+            space = self._condition()
+            async with space:
+                self._pending_bytes -= size
+                space.notify_all()
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
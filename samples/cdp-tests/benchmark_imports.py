@@ -0,0 +1,102 @@
+"""
+Import Time Benchmark - Microsoft Playwright Service
+
+Measure what the CDP samples pay for imports on short invocations, using
+``python -X importtime`` in fresh interpreters.
+
+----------------------------------------
+📌 Prerequisites
+----------------------------------------
+pip install -r requirements.txt
+
+No service credentials are needed: nothing connects anywhere. Service
+settings are removed from the environment of every measured process.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    python benchmark_imports.py
+    python benchmark_imports.py --runs 10
+
+Each row is the median over ``--runs`` fresh interpreters. "heavy modules"
+lists the third-party packages that the invocation ended up importing; on
+these paths only python-dotenv should appear, and only where settings are read.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+
+# Third-party packages worth deferring until they are actually used
+HEAVY_MODULES = ("aiohttp", "playwright", "pydantic", "browser_use", "dotenv")
+
+# (name, interpreter arguments)
+SCENARIOS = [
+    ("import client package", ["-c", "import playwright_service_client"]),
+    ("import get_cdp_endpoint", ["-c", "from playwright_service_client import get_cdp_endpoint"]),
+    ("import test_runner", ["-c", "import test_runner"]),
+    ("test_runner.py --help", ["test_runner.py", "--help"]),
+    ("Browser-Use, no settings", ["Browser-Use-Remote.py"]),
+    ("first endpoint request", ["-c", (
+        "import asyncio\n"
+        "from playwright_service_client import get_cdp_endpoint\n"
+        "try: asyncio.run(get_cdp_endpoint())\n"
+        "except Exception: pass"
+    )]),
+]
+
+
+def measure(args: list[str], env: dict[str, str]) -> tuple[float, float, set[str]]:
+    """Run one fresh interpreter; return (wall ms, import ms, heavy modules imported)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=HERE, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    import_us = 0
+    heavy = set()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        module = name.strip()
+        if not name.startswith("  "):  # top-level import: cumulative already covers its children
+            import_us += int(cumulative)
+        if module.split(".")[0] in HEAVY_MODULES:
+            heavy.add(module.split(".")[0])
+    return wall_ms, import_us / 1000, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of the CDP samples")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    env = {name: value for name, value in os.environ.items() if not name.startswith(("PLAYWRIGHT_SERVICE_", "AZURE_OPENAI_"))}
+    # Compile bytecode once so the first run isn't an outlier
+    measure(["-c", "import test_runner"], env)
+
+    print("=" * 78)
+    print(f"📊 Import time, median of {args.runs} fresh interpreters")
+    print("=" * 78)
+    print(f"{'':<26} {'imports ms':>10} {'wall ms':>9}  heavy modules")
+    for name, scenario_args in SCENARIOS:
+        runs = [measure(scenario_args, env) for _ in range(args.runs)]
+        wall = statistics.median(run[0] for run in runs)
+        imports = statistics.median(run[1] for run in runs)
+        heavy = ", ".join(sorted(set.union(*(run[2] for run in runs)))) or "-"
+        print(f"{name:<26} {imports:>10.1f} {wall:>9.1f}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Session Pool Benchmark - Microsoft Playwright Service
+
+Compare per-test endpoint acquisition latency of ``get_cdp_endpoint()`` with
+``CdpSessionPool`` against a local stub of the provisioning API.
+
+----------------------------------------
+📌 Prerequisites
+----------------------------------------
+pip install aiohttp python-dotenv
+
+No service credentials are needed: the stub service (stub_service.py) runs
+on localhost and simulates the provisioning delay and the per-connection
+handshake cost.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    python benchmark_session_pool.py
+    python benchmark_session_pool.py --tests 100 --concurrency 8 --provision-ms 300
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import asynccontextmanager
+
+from playwright_service_client import CdpSessionPool, get_cdp_endpoint
+from playwright_service_client.session_timings import _percentile
+from stub_service import STUB_SERVICE_URL, StubService
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+async def run_workers(acquire, tests: int, concurrency: int, test_ms: int) -> tuple[list[float], float]:
+    """Run ``tests`` simulated tests and return per-acquire latencies and wall time."""
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(tests):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            async with acquire():
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(test_ms / 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def print_row(name: str, latencies: list[float], wall: float) -> None:
+    latencies = sorted(latencies)
+    print(
+        f"{name:<20} {statistics.mean(latencies):>9.1f} {statistics.median(latencies):>9.1f} "
+        f"{_percentile(latencies, 95):>9.1f} {wall:>9.2f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark CdpSessionPool against get_cdp_endpoint()")
+    parser.add_argument("--tests", type=int, default=40, help="Number of simulated tests")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tests running at the same time")
+    parser.add_argument("--test-ms", type=int, default=300, help="Simulated test duration")
+    parser.add_argument("--provision-ms", type=int, default=200, help="Simulated provisioning delay")
+    parser.add_argument("--handshake-ms", type=int, default=80, help="Simulated per-connection handshake")
+    parser.add_argument("--min-idle", type=int, default=4, help="Pool: sessions fetched ahead of demand")
+    args = parser.parse_args()
+
+    service = StubService(latency_ms=args.provision_ms, handshake_ms=args.handshake_ms)
+    await service.start()
+    endpoint_options = {
+        "service_url": STUB_SERVICE_URL,
+        "access_token": "stub",
+        "api_base_url": service.url,
+    }
+
+    try:
+        @asynccontextmanager
+        async def direct():
+            yield await get_cdp_endpoint(**endpoint_options)
+
+        direct_latencies, direct_wall = await run_workers(direct, args.tests, args.concurrency, args.test_ms)
+
+        pool = CdpSessionPool(
+            min_idle=args.min_idle,
+            max_outstanding=args.concurrency + args.min_idle,
+            **endpoint_options,
+        )
+        async with pool:
+            # Let the pool warm up before the first test, as a suite setup would
+            await asyncio.sleep((args.provision_ms + args.handshake_ms) / 1000)
+            pool_latencies, pool_wall = await run_workers(pool.endpoint, args.tests, args.concurrency, args.test_ms)
+    finally:
+        await service.close()
+
+    print("=" * 60)
+    print(f"📊 Acquire latency over {args.tests} tests (concurrency {args.concurrency})")
+    print("=" * 60)
+    print(f"{'':<20} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'wall s':>9}")
+    print_row("get_cdp_endpoint()", direct_latencies, direct_wall)
+    print_row("CdpSessionPool", pool_latencies, pool_wall)
+    print(f"\n🔁 Pool stats: {pool.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
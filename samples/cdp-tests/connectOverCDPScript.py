@@ -33,13 +33,11 @@ This demonstrates a NON-TESTING scenario for manual browser automation.
 """
 
 import asyncio
-from playwright.async_api import async_playwright
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
-from playwright_service_client import get_cdp_endpoint
+# Settings (including .env) are loaded by the client on first use
+from playwright_service_client import SupervisedBrowser
+from artifact_writer import ArtifactWriter
+from navigation import navigate
 
 
 async def main():
@@ -47,23 +45,19 @@ async def main():
     
     print('🔗 Connecting to Microsoft Playwright Service...')
     
-    # Step 1: Get CDP endpoint from the service
-    # This step will be simplified once OSS redirect support is added
-    cdp_url = await get_cdp_endpoint()
-    print(f'✅ Got CDP endpoint')
-    
-    # Step 2: Connect to remote browser using Playwright
-    # User-Agent header override will be removed after service fix
-    async with async_playwright() as p:
-        browser = await p.chromium.connect_over_cdp(
-            cdp_url,
-            headers={"User-Agent": "Chrome-DevTools-Protocol/1.3"}
-        )
+    # Step 1 + 2: Get a CDP endpoint and connect to the remote browser
+    # SupervisedBrowser calls get_cdp_endpoint() and connect_over_cdp() on the
+    # shared driver, sends keepalives, and reprovisions the browser (restoring
+    # the context below) if the session drops.
+    supervised = SupervisedBrowser(keepalive_interval=15)
+    artifacts = ArtifactWriter(directory=".")
+    try:
+        await supervised.start()
         print(f"✅ Connected to remote browser")
         
         # Step 3: Use the browser
-        context = await browser.new_context()
-        page = await context.new_page()
+        managed = await supervised.new_context()
+        page = await managed.new_page()
         
         # Example: Navigate and take screenshot
         print("📄 Navigating to example.com...")
@@ -72,23 +66,22 @@ async def main():
         title = await page.title()
         print(f"📌 Page title: {title}")
         
-        # Take a screenshot
-        await page.screenshot(path="screenshot.png")
-        print("📸 Screenshot saved to screenshot.png")
+        # Take a screenshot (written by a background thread, not the event loop)
+        path = await artifacts.capture(page, "screenshot.png")
+        print(f"📸 Screenshot saved to {path}")
         
         # Example: Extract content
         heading = await page.locator("h1").text_content()
         print(f"📝 Page heading: {heading}")
         
-        # Example: Click a link
-        await page.click("a")
-        await page.wait_for_load_state("networkidle")
+        # Example: Click a link and wait until the URL changes (not for network idle)
+        await navigate(page, lambda: page.click("a"), label="More information link")
         print(f"🔗 Navigated to: {page.url}")
-        
-        # Cleanup
-        await context.close()
-        await browser.close()
-        print("✅ Done!")
+    finally:
+        # Cleanup, also when a step above failed
+        await supervised.close()
+        await artifacts.close()
+    print("✅ Done!")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+"""
+LLM Response Cache - Microsoft Playwright Service
+
+Answer repeated Browser-Use agent steps from disk instead of the LLM.
+
+----------------------------------------
+📌 Why
+----------------------------------------
+Every agent step sends the task, the history and the current page state to
+the model. When a search is run again (a retry, a re-run of the same batch,
+a deterministic demo), most steps see exactly the same prompt and page and
+get the same answer, yet each one is a full, paid LLM round trip.
+CachedChatModel wraps a browser-use chat model (e.g. ChatAzureOpenAI) and
+keys each call on:
+
+- the model name and the requested output schema
+- the prompt, normalized so that per-run noise (dates, the 4-character tab
+  ids of a fresh browser, whitespace) doesn't cause misses
+- a digest of the ``<browser_state>`` section, i.e. the page the agent sees
+
+Screenshots are left out of the key by default (ads and animations make them
+differ on identical pages); pass ``include_images=True`` to key on them too.
+
+Entries are JSON files in ``directory``, written atomically, so the cache
+survives restarts and is shared by parallel processes. The least recently
+used entries are evicted when the files exceed ``max_bytes``.
+
+A cached answer is replayed as-is: if a site changed in a way the page state
+doesn't show, delete the directory (or use a new one) to start fresh.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    python Browser-Use-Remote.py --llm-cache
+    python Browser-Use-Remote.py --batch tasks.txt --llm-cache .llm_cache --llm-cache-mb 256
+
+    from llm_cache import CachedChatModel
+
+    llm = CachedChatModel(get_llm(), directory=".llm_cache")
+    agent = Agent(task=..., llm=llm, ...)
+    llm.report()
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+# Per-run noise removed from prompts before they are hashed
+NORMALIZE = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"), "<date>"),
+    (re.compile(r"\b(Tab|Current tab:) [0-9A-Fa-f]{4}\b"), r"\1 <id>"),
+    (re.compile(r"\s+"), " "),
+]
+
+_BROWSER_STATE = re.compile(r"<browser_state>(.*?)</browser_state>", re.DOTALL)
+
+
+class CachedChatModel:
+    """
+    Disk-backed, size-bounded LRU cache in front of a browser-use chat model.
+
+    Args:
+        llm: The model to call on a miss (e.g. ``ChatAzureOpenAI``)
+        directory: Where entries are kept
+        max_bytes: Size of all entries before the least recently used are evicted
+        include_images: Key on screenshots as well as on the text prompt
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        directory: str | Path = ".llm_cache",
+        max_bytes: int = 128 * 1024 * 1024,
+        include_images: bool = False,
+    ):
+        self.llm = llm
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.include_images = include_images
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "llm_seconds": 0.0}
+
+        # key -> (last used, size in bytes); loaded once, then kept in step with our writes
+        self._index: dict[str, tuple[float, int]] | None = None
+
+    # browser-use reads these from its chat models
+    @property
+    def model(self) -> str:
+        return self.llm.model
+
+    @property
+    def provider(self) -> str:
+        return self.llm.provider
+
+    @property
+    def name(self) -> str:
+        return self.llm.name
+
+    @property
+    def model_name(self) -> str:
+        return self.llm.model
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything else (model-specific settings) comes from the wrapped model
+        if "llm" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    async def ainvoke(self, messages: list, output_format: type | None = None, **kwargs):
+        """Return the cached answer for this prompt and page, or ask the model and store its answer."""
+        key = self.key(messages, output_format)
+        completion = self._load(key, output_format)
+        if completion is not None:
+            self.stats["hits"] += 1
+            return completion
+
+        self.stats["misses"] += 1
+        start = time.perf_counter()
+        completion = await self.llm.ainvoke(messages, output_format, **kwargs)
+        self.stats["llm_seconds"] += time.perf_counter() - start
+        self._store(key, completion, output_format)
+        return completion
+
+    def key(self, messages: list, output_format: type | None = None) -> str:
+        """Cache key of a call: model, output schema, normalized prompt and page-state digest."""
+        prompt = json.dumps([self._normalize(message.model_dump(mode="json")) for message in messages], sort_keys=True)
+        schema = output_format.model_json_schema() if output_format is not None else None
+        payload = json.dumps({"model": self.llm.model, "schema": schema, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def report(self) -> None:
+        """Print hits, misses and the LLM time saved."""
+        calls = self.stats["hits"] + self.stats["misses"]
+        if not calls:
+            return
+        saved = self.stats["llm_seconds"] / self.stats["misses"] * self.stats["hits"] if self.stats["misses"] else 0.0
+        print(f"🗃️  LLM cache: {self.stats['hits']}/{calls} hits ({self.stats['hits'] / calls:.0%}), "
+              f"{self.stats['misses']} LLM calls ({self.stats['llm_seconds']:.1f}s), ~{saved:.1f}s saved, "
+              f"{self.stats['evictions']} evicted")
+
+    def _normalize(self, value: Any) -> Any:
+        if isinstance(value, str):
+            # The page the agent sees is keyed by its digest, after the same normalization
+            value = _BROWSER_STATE.sub(
+                lambda match: f"<browser_state>{hashlib.sha256(self._normalize(match.group(1)).encode()).hexdigest()}</browser_state>",
+                value,
+            )
+            for pattern, replacement in NORMALIZE:
+                value = pattern.sub(replacement, value)
+            return value.strip()
+        if isinstance(value, dict):
+            if "url" in value and isinstance(value["url"], str) and value["url"].startswith("data:"):
+                # Screenshot: keyed by content, or not at all
+                digest = hashlib.sha256(value["url"].encode()).hexdigest() if self.include_images else "<image>"
+                value = {**value, "url": digest}
+            return {name: self._normalize(item) for name, item in value.items()}
+        if isinstance(value, list):
+            return [self._normalize(item) for item in value]
+        return value
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load(self, key: str, output_format: type | None):
+        from browser_use.llm.views import ChatInvokeCompletion
+
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            completion = entry["completion"]
+            if output_format is not None:
+                completion = output_format.model_validate(completion)
+        except (OSError, ValueError, KeyError):
+            return None  # missing, half-written by a crashed process, or schema changed
+        # Mark as recently used
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        if self._index is not None and key in self._index:
+            self._index[key] = (now, self._index[key][1])
+        # No usage: a cache hit costs no tokens
+        return ChatInvokeCompletion(completion=completion, usage=None)
+
+    def _store(self, key: str, completion: Any, output_format: type | None) -> None:
+        value = completion.completion
+        if output_format is not None:
+            value = value.model_dump(mode="json")
+        data = json.dumps({"model": self.llm.model, "created": time.time(), "completion": value}).encode()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        index = self._load_index()
+        index[key] = (time.time(), len(data))
+        self._evict(index)
+
+    def _load_index(self) -> dict[str, tuple[float, int]]:
+        if self._index is None:
+            self._index = {}
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                self._index[path.stem] = (stat.st_mtime, stat.st_size)
+        return self._index
+
+    def _evict(self, index: dict[str, tuple[float, int]]) -> None:
+        total = sum(size for _, size in index.values())
+        if total <= self.max_bytes:
+            return
+        for key, (_, size) in sorted(index.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            self._path(key).unlink(missing_ok=True)
+            del index[key]
+            total -= size
+            self.stats["evictions"] += 1
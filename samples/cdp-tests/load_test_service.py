@@ -0,0 +1,221 @@
+"""
+Service Load Test - Microsoft Playwright Service
+
+Drive the sample clients at fixed session rates against the local stub
+service (or any service) and report throughput and latency per rate.
+
+----------------------------------------
+📌 Prerequisites
+----------------------------------------
+pip install -r requirements.txt
+playwright install chromium        (only for --client cdp / connect)
+
+No service credentials are needed: by default an in-process StubService is
+started with the given latency, error and throttling settings.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    python load_test_service.py                                   # REST provisioning, 5..40 sessions/s
+    python load_test_service.py --rates 5,10,20 --duration 20 --latency-ms 300 --error-rate 0.05
+    python load_test_service.py --client pool --rate-limit 15     # CdpSessionPool under throttling
+    python load_test_service.py --client cdp --rates 1,2,4        # full sessions on local Chromium
+    python load_test_service.py --api-base-url http://127.0.0.1:8765   # a stub_service.py started separately
+
+Clients:
+    endpoint  get_cdp_endpoint() only (provisioning, retries, hedging)
+    pool      CdpSessionPool.endpoint() (pre-provisioned session URLs)
+    cdp       get_cdp_endpoint() + connect_over_cdp + new page, then close
+    connect   chromium.connect() on the Playwright-protocol endpoint, as
+              connect_options / get_connect_options() do, + new page
+
+Sessions are started on a fixed schedule (open loop), so when the stack
+can't keep up, latency grows instead of the offered rate dropping. Each rate
+is one row: offered and achieved sessions/s, latency percentiles, failures
+and client retries. ``--output curve.jsonl`` appends the rows for plotting.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager, redirect_stdout
+
+from playwright_service_client import CdpSessionPool, get_cdp_endpoint, get_playwright, provision_stats
+from playwright_service_client.session_timings import _percentile
+from stub_service import STUB_SERVICE_URL, StubService
+
+
+# ============================================================================
+# Clients
+# ============================================================================
+
+def make_client(name: str, api_base_url: str, pool: CdpSessionPool | None):
+    """Return ``async def session()`` that runs one session of the chosen client."""
+    endpoint_options = {"service_url": STUB_SERVICE_URL, "access_token": "stub", "api_base_url": api_base_url}
+
+    async def endpoint():
+        await get_cdp_endpoint(**endpoint_options)
+
+    async def pooled():
+        async with pool.endpoint():
+            pass
+
+    async def cdp():
+        cdp_url = await get_cdp_endpoint(**endpoint_options)
+        playwright = await get_playwright()
+        browser = await playwright.chromium.connect_over_cdp(cdp_url)
+        try:
+            context = await browser.new_context()
+            await context.new_page()
+            await context.close()
+        finally:
+            await browser.close()
+
+    async def connect():
+        ws_base = api_base_url.replace("http://", "ws://").replace("https://", "wss://")
+        ws_endpoint = f"{ws_base}/playwrightworkspaces/stub/browsers?os=linux&runId={uuid.uuid4()}&api-version=2025-09-01"
+        playwright = await get_playwright()
+        browser = await playwright.chromium.connect(ws_endpoint, headers={"Authorization": "Bearer stub"})
+        try:
+            await browser.new_page()
+        finally:
+            await browser.close()
+
+    return {"endpoint": endpoint, "pool": pooled, "cdp": cdp, "connect": connect}[name]
+
+
+# ============================================================================
+# Load Test
+# ============================================================================
+
+async def run_rate(session, rate: float, duration: float, timeout: float) -> dict:
+    """Start ``rate`` sessions per second for ``duration`` seconds; return one curve row."""
+    latencies: list[float] = []
+    failures: dict[str, int] = {}
+    in_flight = 0
+    peak_in_flight = 0
+    retries_before = provision_stats["retries"]
+
+    async def one():
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(session(), timeout)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            reason = type(e).__name__ if not str(e) else str(e).splitlines()[0][:100]
+            failures[reason] = failures.get(reason, 0) + 1
+        finally:
+            in_flight -= 1
+
+    total = max(1, round(rate * duration))
+    start = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        # Open loop: start on schedule whether or not earlier sessions finished
+        await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(one()))
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    row = {
+        "offered_per_s": rate,
+        "achieved_per_s": round(len(latencies) / wall, 2),
+        "sessions": total,
+        "failed": total - len(latencies),
+        "retries": provision_stats["retries"] - retries_before,
+        "peak_in_flight": peak_in_flight,
+        "failures": failures,
+    }
+    for pct in (50, 95, 99):
+        row[f"p{pct}_ms"] = round(_percentile(latencies, pct), 1) if latencies else None
+    return row
+
+
+def print_row(row: dict) -> None:
+    def ms(value):
+        return f"{value:>8.0f}" if value is not None else f"{'-':>8}"
+
+    print(
+        f"{row['offered_per_s']:>8g} {row['achieved_per_s']:>9.2f} {ms(row['p50_ms'])} {ms(row['p95_ms'])} "
+        f"{ms(row['p99_ms'])} {row['failed']:>7} {row['retries']:>8} {row['peak_in_flight']:>9}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the Playwright Service clients against a local stub")
+    parser.add_argument("--client", choices=["endpoint", "pool", "cdp", "connect"], default="endpoint", help="What one session does")
+    parser.add_argument("--rates", default="5,10,20,40", help="Comma-separated sessions per second, one row each")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds each rate runs")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds before a session counts as failed")
+    parser.add_argument("--pool-size", type=int, default=8, help="--client pool: max_outstanding (min_idle is half)")
+    parser.add_argument("--output", help="Append one JSON line per rate to this file")
+    parser.add_argument("--api-base-url", help="Use an already running stub (http://host:port) instead of starting one")
+    stub = parser.add_argument_group("in-process stub")
+    stub.add_argument("--latency-ms", type=float, default=200, help="Provisioning delay")
+    stub.add_argument("--jitter-ms", type=float, default=100, help="Extra random provisioning delay")
+    stub.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503")
+    stub.add_argument("--rate-limit", type=float, default=0, help="Sessions per second before 429 (0 = unlimited)")
+    stub.add_argument("--max-sessions", type=int, default=0, help="Open sessions before 429 (0 = unlimited)")
+    args = parser.parse_args()
+    rates = [float(rate) for rate in args.rates.split(",")]
+
+    service = None
+    api_base_url = args.api_base_url
+    if api_base_url is None:
+        service = StubService(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+            rate_limit=args.rate_limit, max_sessions=args.max_sessions,
+        )
+        await service.start()
+        api_base_url = service.url
+
+    @asynccontextmanager
+    async def client_pool():
+        if args.client != "pool":
+            yield None
+            return
+        async with CdpSessionPool(
+            min_idle=args.pool_size // 2, max_outstanding=args.pool_size,
+            service_url=STUB_SERVICE_URL, access_token="stub", api_base_url=api_base_url,
+        ) as pool:
+            yield pool
+
+    print("=" * 78)
+    print(f"📈 {args.client} sessions against {api_base_url}, {args.duration:g}s per rate")
+    print("=" * 78)
+    print(f"{'offered/s':>9} {'achieved':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7} {'retries':>8} {'in flight':>9}")
+    rows = []
+    try:
+        async with client_pool() as pool:
+            session = make_client(args.client, api_base_url, pool)
+            for rate in rates:
+                # Retry messages from the client would interleave with the table; they are counted instead
+                with redirect_stdout(io.StringIO()):
+                    row = await run_rate(session, rate, args.duration, args.timeout)
+                print_row(row)
+                rows.append(row)
+    finally:
+        if service is not None:
+            await service.close()
+
+    for row in rows:
+        if row["failures"]:
+            print(f"❌ {row['offered_per_s']:g}/s: {row['failures']}")
+    if service is not None:
+        print(f"\n🧪 Stub stats: {service.stats}")
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps({"client": args.client, **row}) + "\n")
+        print(f"📝 Curve appended to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,199 @@
+"""
+Navigation Waits - Microsoft Playwright Service
+
+Wait for the signal a navigation actually needs instead of network idle.
+
+----------------------------------------
+📌 Why
+----------------------------------------
+``wait_for_load_state("networkidle")`` waits until no request has been in
+flight for 500 ms. On a remote browser that quiet window comes on top of the
+network latency, and pages with analytics beacons or long polling may not go
+quiet for seconds. Most steps only need one precise signal:
+
+- the URL changed (or matches a pattern)
+- a target element is visible
+- DOMContentLoaded fired and a readiness check passes in the page
+
+navigate() runs the action that triggers the navigation, waits for the
+signals asked for, in that order, and logs how long each one took.
+``navigation_waits.report()`` prints percentiles per signal for a run.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    from navigation import navigate, navigation_waits
+
+    # URL changes away from the current one (the default signal)
+    await navigate(page, lambda: page.click("text=Next"))
+
+    # URL matches, then the results are on screen
+    await navigate(page, lambda: page.click("#search"), url="**/results*", selector=".result")
+
+    # Client-rendered page: DOMContentLoaded, then the app says it's ready
+    await navigate(page, lambda: page.goto(url, wait_until="commit"), ready="() => window.appReady === true")
+
+    navigation_waits.report()
+"""
+
+import re
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from playwright_service_client.session_timings import _percentile
+
+if TYPE_CHECKING:
+    from playwright.async_api import Frame, Page, Request
+
+
+class NavigationWaits:
+    """
+    Durations of navigate() waits, in milliseconds per signal.
+
+    Signals (in the order navigate() waits for them):
+        action            - the call that triggers the navigation
+        url               - until the URL changed or matches, at commit
+        commit            - until a navigation the action started commits
+        domcontentloaded  - DOMContentLoaded of the new document
+        selector          - until the target element is visible
+        ready             - until the readiness predicate returns true
+    """
+
+    SIGNALS = ("action", "url", "commit", "domcontentloaded", "selector", "ready", "total")
+
+    def __init__(self, log: bool = True):
+        self.log = log
+        self.records: list[dict[str, Any]] = []
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Keep one navigate() record and print it if logging is on."""
+        self.records.append(record)
+        if not self.log:
+            return
+        steps = ", ".join(f"{name} {record[name]:.0f} ms" for name in self.SIGNALS[:-1] if name in record)
+        if record.get("error"):
+            print(f"⏱️  {record['label']}: gave up waiting for {record['error']} ({steps})")
+        else:
+            print(f"⏱️  {record['label']}: {steps} (total {record['total']:.0f} ms)")
+
+    def report(self) -> None:
+        """Print count/p50/p95/max per signal over the recorded navigations."""
+        print(f"\n⏱️  Navigation waits over {len(self.records)} navigations (ms)")
+        print(f"{'signal':<17} {'count':>6} {'p50':>9} {'p95':>9} {'max':>9}")
+        for name in self.SIGNALS:
+            values = sorted(record[name] for record in self.records if name in record)
+            if values:
+                print(f"{name:<17} {len(values):>6} {_percentile(values, 50):>9.1f} "
+                      f"{_percentile(values, 95):>9.1f} {values[-1]:>9.1f}")
+
+
+# Process-wide recorder used by the samples
+navigation_waits = NavigationWaits()
+
+
+async def navigate(
+    page: "Page",
+    action: Callable[[], Awaitable[Any]] | None = None,
+    *,
+    url: str | re.Pattern | Callable[[str], bool] | None = None,
+    selector: str | None = None,
+    ready: str | None = None,
+    ready_arg: Any = None,
+    timeout: float = 30000,
+    label: str | None = None,
+) -> dict[str, Any]:
+    """
+    Run ``action`` and wait for the navigation it starts, without waiting for network idle.
+
+    Args:
+        page: Page that navigates
+        action: Triggers the navigation, e.g. ``lambda: page.click("a")``
+        url: Wait until the URL matches (glob, regex or predicate); without
+            ``url``, ``selector`` or ``ready``, wait until the URL changes.
+            With only ``selector`` or ``ready``, a navigation the action
+            started is waited for until it commits, and an action that
+            doesn't navigate (a view change, the same URL) is fine
+        selector: Wait until this element is visible
+        ready: JavaScript predicate run after DOMContentLoaded until it returns
+            a truthy value, e.g. ``"() => window.appReady"``
+        ready_arg: Argument passed to ``ready``
+        timeout: Milliseconds for all waits together
+        label: Name in the log (default: the URL before the action)
+
+    Returns:
+        The record: milliseconds per signal and in total
+
+    Raises:
+        playwright.async_api.TimeoutError: A signal didn't arrive in time
+    """
+    before = page.url
+    record: dict[str, Any] = {"label": label or before}
+    start = step = time.perf_counter()
+
+    def lap(name: str) -> None:
+        nonlocal step
+        now = time.perf_counter()
+        record[name] = round((now - step) * 1000, 1)
+        step = now
+
+    def remaining() -> float:
+        return max(1.0, timeout - (time.perf_counter() - start) * 1000)
+
+    # Main-frame navigations seen since just before the action: started and committed
+    navigations = {"started": 0, "committed": 0}
+
+    def on_request(request: "Request") -> None:
+        # A redirect continues the same navigation
+        if request.is_navigation_request() and request.redirected_from is None and request.frame == page.main_frame:
+            navigations["started"] += 1
+
+    def on_navigated(frame: "Frame") -> None:
+        if frame == page.main_frame:
+            navigations["committed"] += 1
+
+    page.on("request", on_request)
+    page.on("framenavigated", on_navigated)
+    waiting_for = "action"
+    try:
+        if action is not None:
+            await action()
+            lap("action")
+        if url is None and (selector is not None or ready is not None):
+            if navigations["started"] > navigations["committed"]:
+                waiting_for = "commit"
+                # Otherwise DOMContentLoaded and ready could pass on the old document
+                await page.wait_for_event(
+                    "framenavigated", lambda frame: frame == page.main_frame, timeout=remaining()
+                )
+                lap("commit")
+        else:
+            waiting_for = "url"
+            # A navigation that already committed during the action matches right away
+            await page.wait_for_url(
+                url if url is not None else (lambda current: current != before),
+                wait_until="commit",
+                timeout=remaining(),
+            )
+            lap("url")
+        if ready is not None:
+            waiting_for = "domcontentloaded"
+            await page.wait_for_load_state("domcontentloaded", timeout=remaining())
+            lap("domcontentloaded")
+        if selector is not None:
+            waiting_for = "selector"
+            await page.locator(selector).first.wait_for(state="visible", timeout=remaining())
+            lap("selector")
+        if ready is not None:
+            waiting_for = "ready"
+            await page.wait_for_function(ready, arg=ready_arg, timeout=remaining())
+            lap("ready")
+    except Exception:
+        lap(waiting_for)
+        record["error"] = waiting_for
+        raise
+    finally:
+        page.remove_listener("request", on_request)
+        page.remove_listener("framenavigated", on_navigated)
+        record["total"] = round((time.perf_counter() - start) * 1000, 1)
+        navigation_waits.add(record)
+    return record
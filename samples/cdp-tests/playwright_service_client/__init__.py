@@ -0,0 +1,103 @@
+"""
+Microsoft Playwright Service - Python Client
+
+Get a CDP endpoint URL to connect to remote browsers.
+
+Importing the package is cheap: each name below is imported from its
+submodule on first access, aiohttp and playwright are imported when a
+session is first requested, and .env is read once, on first use (see
+``get_config()``).
+
+----------------------------------------
+📌 Prerequisites
+----------------------------------------
+pip install aiohttp python-dotenv
+
+----------------------------------------
+📌 Environment Variables
+----------------------------------------
+PLAYWRIGHT_SERVICE_URL=wss://<region>.api.playwright.microsoft.com/playwrightworkspaces/<workspaceId>/browsers
+PLAYWRIGHT_SERVICE_ACCESS_TOKEN=your_access_token
+    (several comma-separated URLs or region names route each session to the
+     fastest healthy region, see RegionRanking)
+PLAYWRIGHT_SERVICE_TIMINGS=1            (optional: record per-phase session timings)
+PLAYWRIGHT_SERVICE_API_URL=http://127.0.0.1:8765   (optional: provisioning requests go here, e.g. stub_service.py)
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    from playwright_service_client import get_cdp_endpoint
+
+    cdp_url = await get_cdp_endpoint()
+    browser = await playwright.chromium.connect_over_cdp(cdp_url)
+
+Share one Playwright driver process across all connections:
+
+    from playwright_service_client import get_playwright
+
+    playwright = await get_playwright()
+
+Or keep sessions provisioned ahead of demand with a pool:
+
+    from playwright_service_client import CdpSessionPool
+
+    async with CdpSessionPool(min_idle=2, max_outstanding=10) as pool:
+        async with pool.acquire() as browser:
+            page = await browser.new_page()
+
+Or keep one browser alive for a long run, reconnecting and restoring its
+contexts if the session drops:
+
+    from playwright_service_client import SupervisedBrowser
+
+    async with SupervisedBrowser(keepalive_interval=15) as supervised:
+        managed = await supervised.new_context(storage_state="state.json")
+        page = await managed.new_page()
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule that defines it, imported on first access
+_EXPORTS = {
+    "PlaywrightServiceError": "errors",
+    "ServiceConfig": "config",
+    "get_config": "config",
+    "get_cdp_endpoint": "endpoint",
+    "provision_stats": "endpoint",
+    "RegionRanking": "regions",
+    "region_ranking": "regions",
+    "SessionTimings": "session_timings",
+    "timings": "session_timings",
+    "get_playwright": "driver",
+    "stop_playwright": "driver",
+    "driver_stats": "driver",
+    "CdpSessionPool": "pool",
+    "SupervisedBrowser": "supervisor",
+    "ManagedContext": "supervisor",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .config import ServiceConfig, get_config
+    from .driver import driver_stats, get_playwright, stop_playwright
+    from .endpoint import get_cdp_endpoint, provision_stats
+    from .errors import PlaywrightServiceError
+    from .pool import CdpSessionPool
+    from .regions import RegionRanking, region_ranking
+    from .session_timings import SessionTimings, timings
+    from .supervisor import ManagedContext, SupervisedBrowser
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,47 @@
+"""Settings read once from the environment and an optional .env file."""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    """Playwright Service settings (see .env.example)."""
+
+    service_url: str | None
+    access_token: str | None
+    api_base_url: str | None
+    hedge: bool
+    timings: bool
+    timings_file: str | None
+    profile: bool
+    max_parallel: int
+
+
+@lru_cache(maxsize=None)
+def get_config() -> ServiceConfig:
+    """
+    Load .env (once per process) and return the service settings.
+
+    python-dotenv is imported here rather than at import time, so scripts
+    that never read the configuration don't pay for it. Call
+    ``get_config.cache_clear()`` after changing the environment to re-read it.
+    """
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass  # python-dotenv not installed, use system env vars only
+    else:
+        load_dotenv()
+
+    return ServiceConfig(
+        service_url=os.getenv("PLAYWRIGHT_SERVICE_URL"),
+        access_token=os.getenv("PLAYWRIGHT_SERVICE_ACCESS_TOKEN"),
+        api_base_url=os.getenv("PLAYWRIGHT_SERVICE_API_URL"),
+        hedge=os.getenv("PLAYWRIGHT_SERVICE_HEDGE") == "1",
+        timings=os.getenv("PLAYWRIGHT_SERVICE_TIMINGS") == "1",
+        timings_file=os.getenv("PLAYWRIGHT_SERVICE_TIMINGS_FILE"),
+        profile=os.getenv("PLAYWRIGHT_SERVICE_PROFILE") == "1",
+        max_parallel=int(os.getenv("PLAYWRIGHT_SERVICE_MAX_PARALLEL", "4")),
+    )
@@ -0,0 +1,65 @@
+"""One Playwright driver process shared by every connection in the process."""
+
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import Playwright
+
+# Counters for the process-wide driver: "starts_avoided" counts callers that
+# reused the running driver instead of spawning a new Node subprocess.
+driver_stats = {"starts": 0, "starts_avoided": 0}
+
+_driver: asyncio.Future | None = None
+_driver_task: asyncio.Task | None = None
+
+
+async def get_playwright() -> "Playwright":
+    """
+    Return the process-wide Playwright driver, starting it on first use.
+
+    Replaces ``async with async_playwright()`` per connection: the Node driver
+    subprocess is started once per event loop and stopped when the loop shuts
+    down (e.g. when ``asyncio.run()`` returns or the interpreter exits).
+
+    Example:
+        playwright = await get_playwright()
+        browser = await playwright.chromium.connect_over_cdp(cdp_url)
+    """
+    global _driver, _driver_task
+    loop = asyncio.get_running_loop()
+    if _driver is not None and _driver.get_loop() is loop and not _driver_task.done():
+        driver_stats["starts_avoided"] += 1
+    else:
+        driver_stats["starts"] += 1
+        _driver = loop.create_future()
+        _driver_task = loop.create_task(_run_driver(_driver))
+    return await asyncio.shield(_driver)
+
+
+async def stop_playwright() -> None:
+    """Stop the shared Playwright driver now instead of at loop shutdown."""
+    if _driver_task is not None and not _driver_task.done():
+        _driver_task.cancel()
+        await asyncio.gather(_driver_task, return_exceptions=True)
+
+
+async def _run_driver(ready: asyncio.Future) -> None:
+    """Own the driver for the lifetime of the event loop."""
+    from playwright.async_api import async_playwright
+
+    try:
+        playwright = await async_playwright().start()
+    except Exception as e:
+        ready.set_exception(e)
+        return
+    except BaseException:
+        # cancelled during start-up: don't leave get_playwright() callers waiting
+        ready.cancel()
+        raise
+    ready.set_result(playwright)
+    try:
+        # asyncio.run() cancels leftover tasks on exit, which stops the driver
+        await asyncio.Event().wait()
+    finally:
+        await playwright.stop()
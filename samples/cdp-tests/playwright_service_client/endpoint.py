@@ -0,0 +1,272 @@
+"""Provision remote browsers: get_cdp_endpoint() with retries, hedging and region failover."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING
+
+from .config import get_config
+from .errors import PlaywrightServiceError
+from .regions import region_ranking
+from .session_timings import _percentile, timings
+from .urls import _build_request, _parse_url, _service_urls
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+async def _request_session_url(
+    session: "aiohttp.ClientSession",
+    api_url: str,
+    headers: dict[str, str],
+) -> str:
+    """Ask the service for a new browser and return its CDP session URL."""
+    async with session.get(api_url, headers=headers) as response:
+        if response.status == 401:
+            raise PlaywrightServiceError("Authentication failed. Check your access token.", status=401)
+        if response.status == 403:
+            raise PlaywrightServiceError("Access forbidden. Check your permissions.", status=403)
+        if response.status != 200:
+            text = await response.text()
+            raise PlaywrightServiceError(
+                f"Failed to get browser endpoint: HTTP {response.status}\n{text}",
+                status=response.status,
+                retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+                retryable=response.status == 429 or response.status >= 500,
+            )
+
+        data = await response.json()
+        return data["sessionUrl"]
+
+
+# Counters for provisioning requests made through get_cdp_endpoint()/CdpSessionPool
+provision_stats = {"requests": 0, "retries": 0, "hedged": 0, "hedge_wins": 0}
+
+# Recent successful provisioning latencies (seconds), used to derive the hedge delay
+_provision_latencies: deque[float] = deque(maxlen=200)
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_MAX = 10.0
+_RETRY_AFTER_MAX = 60.0
+_DEFAULT_HEDGE_AFTER = 2.0
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), _RETRY_AFTER_MAX)
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt))
+
+
+def _hedge_delay() -> float:
+    """p95 of recent provisioning latencies, or a fixed default until enough samples exist."""
+    if len(_provision_latencies) < 20:
+        return _DEFAULT_HEDGE_AFTER
+    return _percentile(sorted(_provision_latencies), 95)
+
+
+async def _timed_request(
+    session: "aiohttp.ClientSession",
+    api_url: str,
+    headers: dict[str, str],
+    timeout: float,
+) -> str:
+    """One provisioning request with a timeout; transport failures are retryable."""
+    import aiohttp
+
+    provision_stats["requests"] += 1
+    start = time.monotonic()
+    try:
+        cdp_url = await asyncio.wait_for(_request_session_url(session, api_url, headers), timeout)
+    except asyncio.TimeoutError:
+        raise PlaywrightServiceError(
+            f"Timed out after {timeout:g}s waiting for a browser endpoint.", retryable=True
+        ) from None
+    except aiohttp.ClientError as e:
+        raise PlaywrightServiceError(f"Failed to reach Playwright Service: {e}", retryable=True) from e
+    _provision_latencies.append(time.monotonic() - start)
+    return cdp_url
+
+
+async def _attempt(
+    session: "aiohttp.ClientSession",
+    api_url: str,
+    headers: dict[str, str],
+    timeout: float,
+) -> tuple[str, dict[str, float] | None]:
+    """``_timed_request()`` with its timing phases kept apart, so only the winning attempt is counted."""
+    with timings.detached() as record:
+        return await _timed_request(session, api_url, headers, timeout), record
+
+
+async def _hedged_request(
+    session: "aiohttp.ClientSession",
+    api_url: str,
+    headers: dict[str, str],
+    timeout: float,
+    hedge_after: float,
+) -> str:
+    """Fire a second request if the first is slow; the first success wins."""
+    first = asyncio.create_task(_attempt(session, api_url, headers, timeout))
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if not done:
+            provision_stats["hedged"] += 1
+            tasks.add(asyncio.create_task(_attempt(session, api_url, headers, timeout)))
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        provision_stats["hedge_wins"] += 1
+                    cdp_url, record = task.result()
+                    timings.merge(record)
+                    return cdp_url
+                error = task.exception()
+        raise error
+    finally:
+        # The losing request is cancelled; a browser it already provisioned
+        # is released by the service's idle timeout. Awaiting every task
+        # retrieves its result or exception, so none is left dangling.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _provision(
+    session: "aiohttp.ClientSession",
+    api_url: str,
+    headers: dict[str, str],
+    timeout: float = 30.0,
+    retries: int = 3,
+    hedge: bool = False,
+    hedge_after: float | None = None,
+) -> str:
+    """Request a session URL, retrying 429/5xx/timeouts with jittered backoff."""
+    for attempt in range(retries + 1):
+        try:
+            if hedge:
+                delay = hedge_after if hedge_after is not None else _hedge_delay()
+                return await _hedged_request(session, api_url, headers, timeout, delay)
+            return await _timed_request(session, api_url, headers, timeout)
+        except PlaywrightServiceError as e:
+            if not e.retryable or attempt == retries:
+                raise
+            delay = e.retry_after if e.retry_after is not None else _backoff(attempt)
+            print(f"🔁 {e.args[0].splitlines()[0]} Retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            provision_stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+
+async def _provision_ranked(
+    session: "aiohttp.ClientSession",
+    candidates: list[str],
+    access_token: str | None,
+    os_name: str,
+    api_base_url: str | None = None,
+    retries: int = 3,
+    **options,
+) -> str:
+    """Provision from the fastest healthy candidate, failing over on errors."""
+    if len(candidates) == 1:
+        api_url, headers = _build_request(candidates[0], access_token, os_name, api_base_url)
+        return await _provision(session, api_url, headers, retries=retries, **options)
+
+    ranked = await region_ranking.rank(candidates)
+    for i, candidate in enumerate(ranked):
+        api_url, headers = _build_request(candidate, access_token, os_name, api_base_url)
+        last = i == len(ranked) - 1
+        try:
+            # Another region is cheaper than backing off; retry only the last one
+            cdp_url = await _provision(session, api_url, headers, retries=retries if last else 0, **options)
+        except PlaywrightServiceError as e:
+            if not e.retryable or last:
+                raise
+            region_ranking.mark_failed(candidate)
+            print(f"🌍 {_parse_url(candidate)[0]}: {e.args[0].splitlines()[0]} Failing over to the next region")
+            continue
+        region_ranking.selected = candidate
+        return cdp_url
+
+
+async def get_cdp_endpoint(
+    service_url: str | list[str] | None = None,
+    access_token: str | None = None,
+    os_name: str = "Linux",
+    api_version: str = "2025-09-01",
+    api_base_url: str | None = None,
+    session: "aiohttp.ClientSession | None" = None,
+    timeout: float = 30.0,
+    retries: int = 3,
+    hedge: bool | None = None,
+    hedge_after: float | None = None,
+) -> str:
+    """
+    Get a CDP endpoint URL from Microsoft Playwright Service.
+
+    Throttling (429), server errors (5xx), timeouts and connection errors are
+    retried with exponential backoff and jitter, honoring Retry-After.
+
+    With several candidate URLs or regions, the session is requested from the
+    region with the lowest measured RTT (see ``region_ranking``); when that
+    region fails, the next one is tried.
+
+    Args:
+        service_url: Service URL, or candidate URLs / region names as a list or
+            comma-separated string (defaults to PLAYWRIGHT_SERVICE_URL env var)
+        access_token: Access token (defaults to PLAYWRIGHT_SERVICE_ACCESS_TOKEN env var)
+        os_name: Browser OS - "Linux" or "Windows" (default: Linux)
+        api_version: API version (default: 2025-09-01)
+        api_base_url: Override the REST base URL, e.g. a local stub server
+        session: Reuse an existing aiohttp session (default: open a new one)
+        timeout: Seconds to wait for each provisioning request (default: 30)
+        retries: Retries after the first attempt (default: 3)
+        hedge: Fire a second request when the first is slower than usual
+            (default: PLAYWRIGHT_SERVICE_HEDGE=1)
+        hedge_after: Seconds before hedging (default: p95 of recent requests)
+
+    Returns:
+        WebSocket URL for CDP connection
+
+    Example:
+        cdp_url = await get_cdp_endpoint()
+        browser = await playwright.chromium.connect_over_cdp(cdp_url)
+    """
+    if retries < 0:
+        raise ValueError("retries must be at least 0")
+    candidates = _service_urls(service_url)
+    # Fail fast on missing credentials, before any probing
+    _build_request(candidates[0], access_token, os_name, api_base_url)
+    if hedge is None:
+        hedge = get_config().hedge
+    options = {
+        "access_token": access_token, "os_name": os_name, "api_base_url": api_base_url,
+        "timeout": timeout, "retries": retries, "hedge": hedge, "hedge_after": hedge_after,
+    }
+
+    if session is not None:
+        return await _provision_ranked(session, candidates, **options)
+
+    import aiohttp
+
+    async with aiohttp.ClientSession(trace_configs=timings.trace_configs()) as session:
+        return await _provision_ranked(session, candidates, **options)
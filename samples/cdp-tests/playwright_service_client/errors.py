@@ -0,0 +1,17 @@
+"""Errors raised by the Playwright Service client."""
+
+
+class PlaywrightServiceError(Exception):
+    """Exception for Playwright Service errors."""
+
+    def __init__(
+        self,
+        message: str,
+        status: int | None = None,
+        retry_after: float | None = None,
+        retryable: bool = False,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
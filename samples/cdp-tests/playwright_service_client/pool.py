@@ -0,0 +1,234 @@
+"""Pool of pre-provisioned CDP sessions."""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncGenerator
+
+from .driver import get_playwright
+from .endpoint import _provision_ranked
+from .session_timings import _current_timing, timings
+from .urls import _build_request, _service_urls
+
+if TYPE_CHECKING:
+    import aiohttp
+    from playwright.async_api import Browser
+
+
+class CdpSessionPool:
+    """
+    Pool of pre-provisioned CDP sessions sharing one keep-alive HTTP connection.
+
+    Session URLs are fetched ahead of demand so that ``acquire()`` usually
+    returns without waiting on the provisioning round-trip. A caller that
+    finds none idle (or in flight) provisions its own session, so a
+    provisioning error is raised to the caller whose request failed; failed
+    prefetches are only counted in ``stats["errors"]``. ``stats["hits"]``
+    counts acquisitions served by a live pre-fetched session.
+
+    Args:
+        min_idle: Number of session URLs to keep fetched ahead of demand
+        max_outstanding: Upper bound on idle + in-flight + in-use sessions
+        max_idle_age: Seconds before an unused session URL is discarded
+        timeout, retries: Per-request timeout and retries, see ``get_cdp_endpoint()``
+        playwright: Playwright instance (default: the shared ``get_playwright()`` driver)
+        service_url, access_token, os_name, api_base_url: See ``get_cdp_endpoint()``
+
+    Example:
+        async with CdpSessionPool(min_idle=2, max_outstanding=10) as pool:
+            async with pool.acquire() as browser:
+                page = await browser.new_page()
+    """
+
+    def __init__(
+        self,
+        min_idle: int = 1,
+        max_outstanding: int = 5,
+        max_idle_age: float = 60.0,
+        timeout: float = 30.0,
+        retries: int = 3,
+        playwright=None,
+        service_url: str | list[str] | None = None,
+        access_token: str | None = None,
+        os_name: str = "Linux",
+        api_base_url: str | None = None,
+    ):
+        if max_outstanding < 1:
+            raise ValueError("max_outstanding must be at least 1")
+        if not 0 <= min_idle <= max_outstanding:
+            raise ValueError("min_idle must be between 0 and max_outstanding")
+        if retries < 0:
+            raise ValueError("retries must be at least 0")
+
+        self.min_idle = min_idle
+        self.max_outstanding = max_outstanding
+        self.max_idle_age = max_idle_age
+        self.timeout = timeout
+        self.retries = retries
+        self.stats = {"acquired": 0, "hits": 0, "provisioned": 0, "expired": 0, "errors": 0}
+
+        self._candidates = _service_urls(service_url)
+        _build_request(self._candidates[0], access_token, os_name, api_base_url)
+        self._request_options = {"access_token": access_token, "os_name": os_name, "api_base_url": api_base_url}
+        self._playwright = playwright
+        self._session: "aiohttp.ClientSession | None" = None
+        self._idle: deque[tuple[float, str]] = deque()  # (fetched at, session URL), oldest first
+        self._available = asyncio.Condition()  # an idle session arrived or a slot was freed
+        self._fetch_tasks: set[asyncio.Task] = set()
+        self._outstanding = 0  # idle + in-flight + in-use
+        self._inflight = 0
+        self._waiters = 0  # callers waiting for an in-flight prefetch
+
+    async def __aenter__(self) -> "CdpSessionPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Open the shared HTTP connector and start pre-fetching sessions."""
+        if self._session is None:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.max_outstanding,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=timings.trace_configs())
+        self._refill()
+
+    async def close(self) -> None:
+        """Cancel pending fetches and release the HTTP connector."""
+        for task in list(self._fetch_tasks):
+            task.cancel()
+        await asyncio.gather(*self._fetch_tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @asynccontextmanager
+    async def endpoint(self) -> AsyncGenerator[str, None]:
+        """
+        Reserve a pre-fetched CDP session URL for the duration of the block.
+
+        Example:
+            async with pool.endpoint() as cdp_url:
+                profile = BrowserProfile(cdp_url=cdp_url)
+        """
+        cdp_url = await self._take()
+        try:
+            yield cdp_url
+        finally:
+            self._outstanding -= 1
+            await self._notify()
+            self._refill()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator["Browser", None]:
+        """
+        Connect to a pre-fetched remote browser for the duration of the block.
+
+        Example:
+            async with pool.acquire() as browser:
+                page = await browser.new_page()
+        """
+        async with self.endpoint() as cdp_url:
+            playwright = self._playwright or await get_playwright()
+            browser = await playwright.chromium.connect_over_cdp(
+                cdp_url,
+                headers={"User-Agent": "Chrome-DevTools-Protocol/1.3"}
+            )
+            try:
+                yield browser
+            finally:
+                await browser.close()
+
+    async def _take(self) -> str:
+        if self._session is None:
+            await self.start()
+
+        self.stats["acquired"] += 1
+        while True:
+            cdp_url = self._pop_live()
+            if cdp_url is not None:
+                self.stats["hits"] += 1
+                self._refill()
+                return cdp_url
+            if self._inflight <= self._waiters and self._outstanding < self.max_outstanding:
+                return await self._provision_for_caller()
+            # A prefetch on its way is sooner than a new request; at capacity,
+            # wait for a session to be released
+            self._waiters += 1
+            try:
+                async with self._available:
+                    await self._available.wait()
+            finally:
+                self._waiters -= 1
+
+    def _pop_live(self) -> str | None:
+        """Oldest idle session URL that hasn't expired, discarding expired ones."""
+        while self._idle:
+            fetched_at, cdp_url = self._idle.popleft()
+            if time.monotonic() - fetched_at <= self.max_idle_age:
+                return cdp_url
+            self.stats["expired"] += 1
+            self._outstanding -= 1
+        return None
+
+    async def _provision_for_caller(self) -> str:
+        """Provision a session for the current caller; its errors are the caller's."""
+        self._outstanding += 1
+        try:
+            cdp_url = await _provision_ranked(
+                self._session, self._candidates, timeout=self.timeout, retries=self.retries,
+                **self._request_options,
+            )
+        except BaseException as e:
+            self._outstanding -= 1
+            if isinstance(e, Exception):
+                self.stats["errors"] += 1
+            raise
+        self.stats["provisioned"] += 1
+        self._refill()
+        return cdp_url
+
+    async def _notify(self) -> None:
+        async with self._available:
+            self._available.notify_all()
+
+    def _refill(self) -> None:
+        """Start fetches until idle + in-flight sessions cover demand."""
+        while (
+            len(self._idle) + self._inflight < self.min_idle
+            and self._outstanding < self.max_outstanding
+        ):
+            self._outstanding += 1
+            self._inflight += 1
+            task = asyncio.create_task(self._fetch())
+            self._fetch_tasks.add(task)
+            task.add_done_callback(self._fetch_tasks.discard)
+
+    async def _fetch(self) -> None:
+        # Prefetches serve whichever test acquires them; don't bill the caller
+        _current_timing.set(None)
+        try:
+            cdp_url = await _provision_ranked(
+                self._session, self._candidates, timeout=self.timeout, retries=self.retries,
+                **self._request_options,
+            )
+        except asyncio.CancelledError:
+            self._outstanding -= 1
+            raise
+        except Exception:
+            # Nobody asked for this session; a waiting caller provisions its own
+            self.stats["errors"] += 1
+            self._outstanding -= 1
+        else:
+            self.stats["provisioned"] += 1
+            self._idle.append((time.monotonic(), cdp_url))
+        finally:
+            self._inflight -= 1
+        await self._notify()
@@ -0,0 +1,120 @@
+"""Region selection: rank candidate workspace URLs by measured round-trip time."""
+
+import asyncio
+import math
+import socket
+import time
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit
+
+from .urls import _api_base_url, _parse_url
+
+
+async def _probe_rtt(service_url: str, samples: int = 3, timeout: float = 5.0) -> float:
+    """Best TCP connect time (one network round trip) to the region's provisioning host."""
+    parts = urlsplit(_api_base_url(service_url))
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    loop = asyncio.get_running_loop()
+    # Resolve once so DNS isn't counted as latency
+    infos = await asyncio.wait_for(loop.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM), timeout)
+    host = infos[0][4][0]
+
+    best = math.inf
+    for _ in range(samples):
+        start = time.perf_counter()
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        best = min(best, time.perf_counter() - start)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass  # reset by the peer; the transport is closed either way
+    return best
+
+
+class RegionRanking:
+    """
+    Candidate workspace URLs ranked by measured round-trip time.
+
+    The first session probes every candidate concurrently; the ranking is
+    reused for ``ttl`` seconds. A region whose provisioning request fails is
+    ranked last for ``cooldown`` seconds, so new sessions fail over to the
+    next fastest one.
+
+    Args:
+        probe: ``async def probe(service_url) -> seconds``; raise to mark the
+            region unreachable (default: TCP connect time to the region's
+            API host). Swap it for a stub to test region selection locally.
+        ttl: Seconds a measured RTT is reused before probing again
+        cooldown: Seconds a failed region stays at the back of the ranking
+
+    Example:
+        async def fake_probe(service_url):
+            return 0.02 if service_url.startswith("wss://westeurope.") else 0.2
+
+        region_ranking.probe = fake_probe
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[str], Awaitable[float]] | None = None,
+        ttl: float = 300.0,
+        cooldown: float = 60.0,
+    ):
+        self.probe = probe or _probe_rtt
+        self.ttl = ttl
+        self.cooldown = cooldown
+        self.rtts: dict[str, float] = {}  # candidate URL -> seconds (inf = unreachable)
+        self.selected: str | None = None  # candidate that provisioned the last session
+        self.stats = {"probes": 0, "probe_errors": 0, "failovers": 0}
+        self._probed_at: dict[str, float] = {}
+        self._failed_until: dict[str, float] = {}
+        self._probing: dict[str, asyncio.Task] = {}
+
+    async def rank(self, candidates: list[str]) -> list[str]:
+        """Return ``candidates`` healthy-first, fastest-first, probing stale entries."""
+        now = time.monotonic()
+        stale = [url for url in candidates if now - self._probed_at.get(url, -math.inf) > self.ttl]
+        if stale:
+            await asyncio.gather(*(self._probe_once(url) for url in stale))
+
+        now = time.monotonic()
+        return sorted(
+            candidates,
+            key=lambda url: (self._failed_until.get(url, 0) > now, self.rtts.get(url, math.inf)),
+        )
+
+    def mark_failed(self, candidate: str) -> None:
+        """Send new sessions elsewhere for the cooldown period."""
+        self._failed_until[candidate] = time.monotonic() + self.cooldown
+        self.stats["failovers"] += 1
+
+    def report(self) -> None:
+        """Print the current ranking."""
+        print("\n🌍 Region ranking (RTT)")
+        for url, rtt in sorted(self.rtts.items(), key=lambda item: item[1]):
+            region, _ = _parse_url(url)
+            failed = " (failing over)" if self._failed_until.get(url, 0) > time.monotonic() else ""
+            print(f"  {region:<20} {'unreachable' if math.isinf(rtt) else f'{rtt * 1000:.1f} ms'}{failed}")
+
+    async def _probe_once(self, candidate: str) -> None:
+        # Concurrent sessions at startup share one probe per candidate
+        task = self._probing.get(candidate)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._probe(candidate))
+            self._probing[candidate] = task
+        await asyncio.shield(task)
+
+    async def _probe(self, candidate: str) -> None:
+        self.stats["probes"] += 1
+        try:
+            rtt = await self.probe(candidate)
+        except Exception:
+            self.stats["probe_errors"] += 1
+            rtt = math.inf
+        self.rtts[candidate] = rtt
+        self._probed_at[candidate] = time.monotonic()
+
+
+# Process-wide ranking shared by get_cdp_endpoint() and CdpSessionPool
+region_ranking = RegionRanking()
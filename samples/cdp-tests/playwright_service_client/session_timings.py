@@ -0,0 +1,206 @@
+"""Opt-in per-phase timing of remote browser sessions."""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterator
+
+from .config import get_config
+from .errors import PlaywrightServiceError
+from .regions import region_ranking
+from .urls import _parse_url, _service_urls
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# Per-session record of the task currently opening a session (None = not recorded)
+_current_timing: ContextVar[dict[str, float] | None] = ContextVar("_current_timing", default=None)
+
+
+class SessionTimings:
+    """
+    Opt-in breakdown of where time goes between requesting a session and
+    having a usable page.
+
+    Phases (milliseconds, non-overlapping):
+        dns          - resolving the provisioning host
+        connect      - TCP + TLS handshake to the provisioning API
+        provision    - provisioning request until the response headers arrive
+        cdp_connect  - WebSocket upgrade and CDP handshake in connect_over_cdp
+        new_context  - first browser.new_context()
+        new_page     - first context.new_page()
+
+    Enable with PLAYWRIGHT_SERVICE_TIMINGS=1 or ``timings.enabled = True``.
+
+    Example:
+        with timings.session():
+            cdp_url = await get_cdp_endpoint()
+            with timings.phase("cdp_connect"):
+                browser = await playwright.chromium.connect_over_cdp(cdp_url)
+        timings.report()
+    """
+
+    PHASES = ("dns", "connect", "provision", "cdp_connect", "new_context", "new_page")
+
+    def __init__(self, enabled: bool | None = None):
+        self._enabled = enabled
+        self.sessions: list[dict[str, float]] = []
+        self._trace_config: "aiohttp.TraceConfig | None" = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether sessions are recorded (default: PLAYWRIGHT_SERVICE_TIMINGS=1, read on first use)."""
+        if self._enabled is None:
+            self._enabled = get_config().timings
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self._enabled = value
+
+    @contextmanager
+    def session(self) -> Iterator[dict[str, float] | None]:
+        """Record the phases of one session opened inside this block."""
+        if not self.enabled or _current_timing.get() is not None:
+            yield _current_timing.get()
+            return
+
+        record: dict[str, float] = {}
+        token = _current_timing.set(record)
+        try:
+            yield record
+        finally:
+            _current_timing.reset(token)
+            if record:
+                self.sessions.append(record)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the block as ``name`` in the current session, if any."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def detached(self) -> Iterator[dict[str, float] | None]:
+        """
+        Record the block's phases apart from the current session (None if not recording).
+
+        For concurrent attempts of which only one counts: ``merge()`` the
+        winner's record into the session afterwards.
+        """
+        if _current_timing.get() is None:
+            yield None
+            return
+        record: dict[str, float] = {}
+        token = _current_timing.set(record)
+        try:
+            yield record
+        finally:
+            _current_timing.reset(token)
+
+    def merge(self, record: dict[str, float] | None) -> None:
+        """Add phases recorded by ``detached()`` to the current session."""
+        for name, elapsed_ms in (record or {}).items():
+            self._add(name, elapsed_ms)
+
+    def trace_configs(self) -> list["aiohttp.TraceConfig"]:
+        """aiohttp hooks that split a provisioning request into dns/connect/provision."""
+        if self._trace_config is None:
+            self._trace_config = self._build_trace_config()
+        return [self._trace_config]
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        """Return count/p50/p95/p99 per phase over the recorded sessions."""
+        summary = {}
+        for name in self.PHASES:
+            values = sorted(record[name] for record in self.sessions if name in record)
+            if values:
+                summary[name] = {
+                    "count": len(values),
+                    "p50": round(_percentile(values, 50), 1),
+                    "p95": round(_percentile(values, 95), 1),
+                    "p99": round(_percentile(values, 99), 1),
+                }
+        return summary
+
+    def report(self) -> None:
+        """Print the per-phase percentile table."""
+        print(f"\n⏱️  Session timings over {len(self.sessions)} sessions (ms)")
+        print(f"{'phase':<12} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for name, row in self.percentiles().items():
+            print(f"{name:<12} {row['count']:>6} {row['p50']:>9} {row['p95']:>9} {row['p99']:>9}")
+
+    def write_jsonl(self, path: str, region: str | None = None) -> None:
+        """Append one JSON line with this run's percentiles, labelled by region."""
+        if region is None:
+            try:
+                region, _ = _parse_url(region_ranking.selected or _service_urls(None)[0])
+            except PlaywrightServiceError:
+                region = "unknown"
+        line = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "region": region,
+            "sessions": len(self.sessions),
+            "phases": self.percentiles(),
+        }
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line) + "\n")
+
+    def _add(self, name: str, elapsed_ms: float) -> None:
+        record = _current_timing.get()
+        if record is not None:
+            record[name] = record.get(name, 0.0) + elapsed_ms
+
+    def _build_trace_config(self) -> "aiohttp.TraceConfig":
+        import aiohttp
+
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.perf_counter()
+            ctx.dns_ms = ctx.connect_ms = 0.0
+
+        async def on_dns_start(session, ctx, params):
+            ctx.dns_start = time.perf_counter()
+
+        async def on_dns_end(session, ctx, params):
+            elapsed = (time.perf_counter() - ctx.dns_start) * 1000
+            ctx.dns_ms += elapsed
+            self._add("dns", elapsed)
+
+        async def on_connection_start(session, ctx, params):
+            ctx.connect_start = time.perf_counter()
+            ctx.dns_before_connect = ctx.dns_ms
+
+        async def on_connection_end(session, ctx, params):
+            # DNS resolution happens inside connection creation; don't count it twice
+            elapsed = (time.perf_counter() - ctx.connect_start) * 1000
+            ctx.connect_ms = elapsed - (ctx.dns_ms - ctx.dns_before_connect)
+            self._add("connect", ctx.connect_ms)
+
+        async def on_request_end(session, ctx, params):
+            elapsed = (time.perf_counter() - ctx.start) * 1000
+            self._add("provision", elapsed - ctx.dns_ms - ctx.connect_ms)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        trace_config.on_connection_create_start.append(on_connection_start)
+        trace_config.on_connection_create_end.append(on_connection_end)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+# Process-wide recorder used by the samples
+timings = SessionTimings()
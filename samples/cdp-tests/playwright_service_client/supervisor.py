@@ -0,0 +1,273 @@
+"""Supervised remote browser: keepalives, reprovisioning and context replay."""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from .driver import get_playwright
+from .endpoint import _backoff, get_cdp_endpoint
+from .errors import PlaywrightServiceError
+from .session_timings import timings
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, CDPSession, Page, Route
+
+
+class ManagedContext:
+    """
+    A browser context that is recreated after the browser reconnects.
+
+    ``context`` always refers to the live BrowserContext; pages of a context
+    that was lost are gone and have to be reopened with ``new_page()``.
+    """
+
+    def __init__(
+        self,
+        options: dict[str, Any],
+        setup: Callable[["BrowserContext"], Awaitable[None]] | None,
+        keep_storage: bool,
+    ):
+        self.options = options
+        self.setup = setup
+        self.keep_storage = keep_storage
+        self.context: "BrowserContext | None" = None
+        self.storage_state: dict | None = None  # last snapshot, replayed on reconnect
+        self.generation = 0  # increments each time the context is (re)created
+        self._routes: list[tuple[Any, Callable]] = []
+
+    async def new_page(self) -> "Page":
+        """Open a page in the live context."""
+        return await self.context.new_page()
+
+    async def route(self, url: Any, handler: Callable[["Route"], Any]) -> None:
+        """``context.route()`` that is installed again on every recreated context."""
+        self._routes.append((url, handler))
+        await self.context.route(url, handler)
+
+    async def _create(self, browser: "Browser") -> None:
+        options = dict(self.options)
+        if self.storage_state is not None:
+            options["storage_state"] = self.storage_state
+        context = await browser.new_context(**options)
+        for url, handler in self._routes:
+            await context.route(url, handler)
+        if self.setup is not None:
+            await self.setup(context)
+        self.context = context
+        self.generation += 1
+
+    async def _snapshot(self) -> None:
+        if self.keep_storage and self.context is not None:
+            self.storage_state = await self.context.storage_state()
+
+
+class SupervisedBrowser:
+    """
+    A remote browser that is kept connected for long-running sessions.
+
+    - watches the ``disconnected`` event and reprovisions through
+      ``get_cdp_endpoint()`` with jittered exponential backoff
+    - sends a lightweight CDP command (``Browser.getVersion``) every
+      ``keepalive_interval`` seconds, so idle sessions are not timed out and
+      half-open sockets are detected; a keepalive that fails or times out
+      is treated as a dropped connection
+    - recreates every context opened with ``new_context()`` on the new
+      browser, with its options, routes and setup function, and (with
+      ``keep_storage=True``) the storage state snapshotted at the last
+      keepalive
+
+    Args:
+        keepalive_interval: Seconds between keepalives (0 disables them)
+        keepalive_timeout: Seconds a keepalive may take before the connection
+            is considered dead
+        max_reconnect_attempts: Reprovisioning attempts per disconnect
+        on_connect: Called with the Browser after every (re)connect
+        playwright: Playwright instance (default: the shared ``get_playwright()`` driver)
+        endpoint_options: Passed to ``get_cdp_endpoint()``
+
+    Example:
+        async with SupervisedBrowser() as supervised:
+            managed = await supervised.new_context(storage_state="state.json")
+            await managed.route("**/*.png", lambda route: route.abort())
+            page = await managed.new_page()
+    """
+
+    def __init__(
+        self,
+        keepalive_interval: float = 15.0,
+        keepalive_timeout: float = 10.0,
+        max_reconnect_attempts: int = 5,
+        on_connect: Callable[["Browser"], Any] | None = None,
+        playwright=None,
+        **endpoint_options,
+    ):
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_timeout = keepalive_timeout
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.on_connect = on_connect
+        self.endpoint_options = endpoint_options
+        self.stats = {"connects": 0, "reconnects": 0, "keepalives": 0, "keepalive_failures": 0, "replayed_contexts": 0}
+
+        self._playwright = playwright
+        self._browser: "Browser | None" = None
+        self._cdp: "CDPSession | None" = None
+        self._contexts: list[ManagedContext] = []
+        self._connecting: asyncio.Task | None = None
+        self._keepalive_task: asyncio.Task | None = None
+        self._closed = False
+
+    async def __aenter__(self) -> "SupervisedBrowser":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Connect and start the keepalive loop."""
+        self._closed = False
+        if self.keepalive_interval and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+        await self.browser()
+
+    async def browser(self) -> "Browser":
+        """Return the connected browser, waiting for a reconnect in progress."""
+        if self._closed:
+            raise PlaywrightServiceError("SupervisedBrowser is closed.")
+        if self._browser is None or not self._browser.is_connected():
+            self._reconnect()
+        if self._connecting is not None:
+            # shield: a caller giving up must not cancel the reconnect for everyone else
+            await asyncio.shield(self._connecting)
+        return self._browser
+
+    async def new_context(
+        self,
+        setup: Callable[["BrowserContext"], Awaitable[None]] | None = None,
+        keep_storage: bool = False,
+        **context_options,
+    ) -> ManagedContext:
+        """
+        Open a context that is recreated whenever the browser reconnects.
+
+        Args:
+            setup: ``async def setup(context)`` run on every (re)created context,
+                e.g. to add init scripts or routes
+            keep_storage: Snapshot cookies and local storage at each keepalive
+                and restore them after a reconnect
+            context_options: Passed to ``browser.new_context()``
+        """
+        managed = ManagedContext(context_options, setup, keep_storage)
+        await managed._create(await self.browser())
+        self._contexts.append(managed)
+        return managed
+
+    async def close_context(self, managed: ManagedContext) -> None:
+        """Close a managed context and stop replaying it."""
+        if managed in self._contexts:
+            self._contexts.remove(managed)
+        if managed.context is not None and self._browser is not None and self._browser.is_connected():
+            await managed.context.close()
+
+    async def close(self) -> None:
+        """Stop supervising and close the browser."""
+        self._closed = True
+        for task in (self._keepalive_task, self._connecting):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(task for task in (self._keepalive_task, self._connecting) if task is not None),
+            return_exceptions=True,
+        )
+        self._keepalive_task = self._connecting = None
+        if self._browser is not None and self._browser.is_connected():
+            await self._browser.close()
+        self._browser = None
+        self._contexts.clear()
+
+    def _reconnect(self) -> None:
+        """Start reprovisioning unless it is already running."""
+        if self._connecting is None or self._connecting.done():
+            self._connecting = asyncio.create_task(self._connect_with_retries())
+            self._connecting.add_done_callback(self._on_connect_done)
+
+    @staticmethod
+    def _on_connect_done(task: asyncio.Task) -> None:
+        # A reconnect started by the disconnected event or the keepalive may
+        # fail with nobody awaiting it; retrieve and report the error here
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Reprovisioning the remote browser failed: {task.exception()}")
+
+    async def _connect_with_retries(self) -> None:
+        first = self._browser is None
+        if not first:
+            print("🔄 Remote browser disconnected, reprovisioning...")
+        for attempt in range(self.max_reconnect_attempts):
+            try:
+                await self._connect()
+                for managed in self._contexts:
+                    await managed._create(self._browser)
+                    self.stats["replayed_contexts"] += 1
+            except Exception as e:
+                # Don't leak a browser whose contexts could not be restored
+                if self._browser is not None and self._browser.is_connected():
+                    await self._browser.close()
+                if attempt == self.max_reconnect_attempts - 1:
+                    raise
+                delay = _backoff(attempt)
+                print(f"🔁 Reconnect failed ({e}), retrying in {delay:.1f}s ({attempt + 1}/{self.max_reconnect_attempts})")
+                await asyncio.sleep(delay)
+            else:
+                if not first:
+                    self.stats["reconnects"] += 1
+                    print(f"✅ Reconnected; {len(self._contexts)} context(s) restored")
+                return
+
+    async def _connect(self) -> None:
+        cdp_url = await get_cdp_endpoint(**self.endpoint_options)
+        playwright = self._playwright or await get_playwright()
+        with timings.phase("cdp_connect"):
+            browser = await playwright.chromium.connect_over_cdp(
+                cdp_url,
+                headers={"User-Agent": "Chrome-DevTools-Protocol/1.3"}
+            )
+        try:
+            self._cdp = await browser.new_browser_cdp_session()
+        except Exception:
+            await browser.close()
+            raise
+        browser.on("disconnected", self._on_disconnected)
+        self._browser = browser
+        self.stats["connects"] += 1
+        if self.on_connect is not None:
+            self.on_connect(browser)
+
+    def _on_disconnected(self, browser: "Browser") -> None:
+        # Ignore late events from a browser that was already replaced
+        if browser is self._browser and not self._closed:
+            self._reconnect()
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            if self._browser is None or (self._connecting is not None and not self._connecting.done()):
+                continue
+            browser = self._browser
+            start = time.monotonic()
+            try:
+                await asyncio.wait_for(self._cdp.send("Browser.getVersion"), self.keepalive_timeout)
+                self.stats["keepalives"] += 1
+                for managed in self._contexts:
+                    await managed._snapshot()
+            except Exception as e:
+                if browser is not self._browser:
+                    continue  # reconnected while the keepalive was in flight
+                self.stats["keepalive_failures"] += 1
+                print(f"💔 Keepalive failed after {time.monotonic() - start:.1f}s: {str(e) or type(e).__name__}")
+                # Drop the half-open socket; the disconnected event reprovisions
+                try:
+                    await asyncio.wait_for(browser.close(), self.keepalive_timeout)
+                except Exception:
+                    pass
+                if browser is self._browser:
+                    self._reconnect()
@@ -0,0 +1,104 @@
+"""Service URL parsing and provisioning request building."""
+
+import re
+
+from .config import get_config
+from .errors import PlaywrightServiceError
+
+# URL pattern: wss://<region>.api.playwright.microsoft.com/playwrightworkspaces/<workspaceId>/browsers
+_URL_PATTERN = re.compile(
+    r'wss://(\w+)\.api\.playwright\.microsoft\.com/playwrightworkspaces/([^/]+)/browsers'
+)
+
+
+def _parse_url(url: str) -> tuple[str, str]:
+    """Extract region and workspace ID from service URL."""
+    match = _URL_PATTERN.match(url)
+    if not match:
+        raise PlaywrightServiceError(
+            f"Invalid PLAYWRIGHT_SERVICE_URL format: {url}\n"
+            f"Expected: wss://<region>.api.playwright.microsoft.com/playwrightworkspaces/<workspaceId>/browsers"
+        )
+    return match.group(1), match.group(2)
+
+
+def _service_urls(service_url: str | list[str] | None) -> list[str]:
+    """
+    Resolve the candidate workspace URLs.
+
+    Accepts one URL, a list, or a comma-separated string (also in
+    PLAYWRIGHT_SERVICE_URL). Bare region names stand for the first URL's
+    workspace in that region.
+    """
+    service_url = service_url or get_config().service_url
+    if not service_url:
+        raise PlaywrightServiceError(
+            "PLAYWRIGHT_SERVICE_URL environment variable is not set.\n"
+            "Expected: wss://<region>.api.playwright.microsoft.com/playwrightworkspaces/<workspaceId>/browsers"
+        )
+    items = service_url.split(",") if isinstance(service_url, str) else list(service_url)
+    items = [item.strip() for item in items if item.strip()]
+    if not items:
+        raise PlaywrightServiceError(
+            "No service URLs configured in PLAYWRIGHT_SERVICE_URL.\n"
+            "Expected: wss://<region>.api.playwright.microsoft.com/playwrightworkspaces/<workspaceId>/browsers"
+        )
+
+    workspace_id = None
+    urls: list[str] = []
+    for item in items:
+        if "://" in item:
+            url = item
+            _, workspace = _parse_url(url)
+            workspace_id = workspace_id or workspace
+        elif workspace_id is None:
+            raise PlaywrightServiceError(
+                f"Region '{item}' listed before any full workspace URL in PLAYWRIGHT_SERVICE_URL."
+            )
+        else:
+            url = f"wss://{item}.api.playwright.microsoft.com/playwrightworkspaces/{workspace_id}/browsers"
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _api_base_url(service_url: str, api_base_url: str | None = None) -> str:
+    """REST base URL serving the region of ``service_url`` (or the override, e.g. a local stub)."""
+    api_base_url = api_base_url or get_config().api_base_url
+    if api_base_url:
+        return api_base_url.rstrip("/")
+    region, _ = _parse_url(service_url)
+    return f"https://{region}.api.playwright.microsoft.com"
+
+
+def _build_request(
+    service_url: str | None,
+    access_token: str | None,
+    os_name: str,
+    api_base_url: str | None = None,
+) -> tuple[str, dict[str, str]]:
+    """Resolve credentials and build the browser provisioning URL and headers."""
+    # Get credentials from env vars / .env if not provided
+    service_url = service_url or _service_urls(None)[0]
+    access_token = access_token or get_config().access_token
+
+    if not access_token:
+        raise PlaywrightServiceError(
+            "PLAYWRIGHT_SERVICE_ACCESS_TOKEN environment variable is not set."
+        )
+
+    # Parse URL to get region and workspace ID
+    _, workspace_id = _parse_url(service_url)
+
+    # Build API URL
+    api_base_url = _api_base_url(service_url, api_base_url)
+    api_url = (
+        f"{api_base_url}"
+        f"/playwrightworkspaces/{workspace_id}/browsers"
+        f"?os={os_name}&browser=chromium&playwrightVersion=cdp&shouldRedirect=false")
+
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json",
+    }
+    return api_url, headers
@@ -0,0 +1,20 @@
+"""
+Structured output models for the Browser-Use product search samples.
+
+Kept in their own module so the scripts import pydantic only when an agent
+actually runs.
+"""
+
+from pydantic import BaseModel
+
+
+class Product(BaseModel):
+    name: str
+    price: str
+    rating: str | None = None
+    reviews: str | None = None
+    url: str
+
+
+class ProductSearchResults(BaseModel):
+    items: list[Product] = []
@@ -0,0 +1,164 @@
+"""
+Round-Trip Profiler - Microsoft Playwright Service
+
+See which test steps cost the most protocol round trips to a remote browser.
+
+----------------------------------------
+📌 Why
+----------------------------------------
+Against a remote browser every Playwright call (``page.title()``,
+``locator.text_content()``, ``click()``) waits for a network round trip.
+RoundTripProfiler records each protocol call made through the Playwright
+driver with its latency, its API name, the source line that issued it and the
+test that was running, and summarizes them per test as a flame-style tree
+(test -> step -> call). Steps with many round trips are candidates for
+batching, e.g. several locator reads replaced by one ``page.evaluate()``.
+
+The profiler wraps the message transport of the driver connection, which is
+not a public Playwright API (``Connection._transport.send`` and
+``on_message``, checked against Playwright 1.55); it is meant for profiling
+runs, not production. samples/cdp-tests and samples/playwright-pytest ship
+identical copies of this module (the pytest conftest adds saving and merging
+across xdist workers); change both together.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    from round_trip_profiler import RoundTripProfiler
+
+    profiler = RoundTripProfiler()
+    profiler.attach(browser)
+
+    with profiler.test("checkout"):
+        await page.goto("https://example.com")
+        await page.title()
+
+    profiler.report()
+    profiler.write_folded("round-trips.folded")   # flamegraph.pl / speedscope
+"""
+
+import linecache
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+# Test currently running in this task (None = not inside profiler.test())
+_current_test: ContextVar[str | None] = ContextVar("_current_test", default=None)
+
+
+class RoundTripProfiler:
+    """
+    Per-test record of Playwright protocol calls and their latency.
+
+    Args:
+        enabled: Record calls (attach() is a no-op while disabled)
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        # One dict per completed call: test, step, api, ms
+        self.calls: list[dict[str, Any]] = []
+
+    def attach(self, playwright_object: Any) -> None:
+        """
+        Start recording calls made through the driver connection of
+        ``playwright_object`` (a Browser, BrowserContext or Page).
+
+        All objects of one driver share a connection, so attaching once
+        covers every browser opened by that driver.
+        """
+        if not self.enabled:
+            return
+        connection = playwright_object._impl_obj._connection
+        if getattr(connection, "_round_trip_profiler", None) is self:
+            return
+        connection._round_trip_profiler = self
+
+        transport = connection._transport
+        send, on_message = transport.send, transport.on_message
+        pending: dict[str, tuple[float, str, str, str | None]] = {}
+
+        def profiled_send(message: dict) -> None:
+            if "id" in message:
+                metadata = message.get("metadata", {})
+                api = metadata.get("apiName") or message["method"]
+                pending[message["id"]] = (time.perf_counter(), api, _step(metadata), _current_test.get())
+            send(message)
+
+        def profiled_on_message(message: dict) -> None:
+            started = pending.pop(message.get("id"), None)
+            if started is not None:
+                start, api, step, test = started
+                self.calls.append({
+                    "test": test or "(no test)",
+                    "step": step,
+                    "api": api,
+                    "ms": (time.perf_counter() - start) * 1000,
+                })
+            on_message(message)
+
+        transport.send = profiled_send
+        transport.on_message = profiled_on_message
+
+    @contextmanager
+    def test(self, name: str) -> Iterator[None]:
+        """Attribute calls made inside the block (in this task) to test ``name``."""
+        token = _current_test.set(name)
+        try:
+            yield
+        finally:
+            _current_test.reset(token)
+
+    def summary(self) -> dict[str, dict]:
+        """Nested totals: test -> step -> api -> {"calls", "ms"}, each level with its own totals."""
+        tree: dict[str, dict] = {}
+        for call in self.calls:
+            levels = [tree.setdefault(call["test"], {"calls": 0, "ms": 0.0, "children": {}})]
+            levels.append(levels[-1]["children"].setdefault(call["step"], {"calls": 0, "ms": 0.0, "children": {}}))
+            levels.append(levels[-1]["children"].setdefault(call["api"], {"calls": 0, "ms": 0.0, "children": {}}))
+            for node in levels:
+                node["calls"] += 1
+                node["ms"] += call["ms"]
+        return tree
+
+    def report_lines(self, top_tests: int | None = None, top_steps: int = 5) -> list[str]:
+        """The heaviest tests (all unless ``top_tests``) and, under each, its heaviest steps."""
+        tree = self.summary()
+        lines = [f"🔥 Round trips over {len(tree)} tests ({len(self.calls)} calls), heaviest first"]
+        tests = sorted(tree.items(), key=lambda item: -item[1]["ms"])
+        for test, node in tests[:top_tests]:
+            lines.append(f"{test}: {node['calls']} round trips, {node['ms']:.0f} ms")
+            steps = sorted(node["children"].items(), key=lambda item: -item[1]["ms"])
+            for step, step_node in steps[:top_steps]:
+                lines.append(f"  {step_node['calls']:>4} × {step_node['ms']:>8.1f} ms  {step}")
+                for api, api_node in sorted(step_node["children"].items(), key=lambda item: -item[1]["ms"]):
+                    lines.append(f"  {'':>4}   {api_node['ms']:>8.1f} ms    └ {api} ×{api_node['calls']}")
+        return lines
+
+    def report(self, top_tests: int | None = None, top_steps: int = 5) -> None:
+        """Print each test's round trips, heaviest steps first."""
+        print()
+        for line in self.report_lines(top_tests, top_steps):
+            print(line)
+
+    def write_folded(self, path: str) -> None:
+        """Write folded stacks (``test;step;api <microseconds>``) for flame graph tools."""
+        lines = []
+        for test, node in self.summary().items():
+            for step, step_node in node["children"].items():
+                for api, api_node in step_node["children"].items():
+                    frames = ";".join(part.replace(";", ",") for part in (test, step, api))
+                    lines.append(f"{frames} {round(api_node['ms'] * 1000)}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _step(metadata: dict) -> str:
+    """The user source line that issued a call, e.g. ``test_runner.py:270 await page.title()``."""
+    location = metadata.get("location")
+    if not location:
+        return "(internal)"
+    source = linecache.getline(location["file"], location["line"]).strip()
+    return f"{os.path.basename(location['file'])}:{location['line']} {source}".rstrip()
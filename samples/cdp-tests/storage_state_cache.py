@@ -0,0 +1,175 @@
+"""
+Storage State Cache - Microsoft Playwright Service
+
+Log in once per identity and reuse the signed-in state in every new context.
+
+----------------------------------------
+📌 Why
+----------------------------------------
+Replaying a sign-in flow on a remote browser for every test is usually the
+slowest step of a suite. StorageStateCache runs your login function once per
+identity, saves the context's ``storage_state`` (cookies + local storage) to a
+file, and hands that file to every later ``browser.new_context()``. The file is
+protected by a lock file, so parallel processes log in only once between them.
+
+Entries expire after ``ttl`` seconds or, when ``auth_cookies`` names the
+cookies that carry the sign-in, when the first of those expires, whichever
+comes first. They can be invalidated on an auth failure (see
+``rejects_sign_in()``).
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    from storage_state_cache import StorageStateCache
+
+    async def login(page, identity):
+        await page.goto("https://example.com/login")
+        await page.fill("#user", identity)
+        ...
+
+    cache = StorageStateCache(login)
+    context = await browser.new_context(storage_state=await cache.get("alice", browser))
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page, Response
+
+
+class _FileLock:
+    """Cross-process lock held by exclusively creating a lock file."""
+
+    def __init__(self, path: Path, stale_after: float = 120.0):
+        self.path = path
+        self.stale_after = stale_after
+
+    async def __aenter__(self) -> None:
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                try:
+                    # A holder that crashed mid-login must not block everyone forever
+                    if time.time() - self.path.stat().st_mtime > self.stale_after:
+                        self.path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                await asyncio.sleep(0.2)
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class StorageStateCache:
+    """
+    Per-identity storage state files shared across tests and processes.
+
+    Args:
+        login: ``async def login(page, identity)`` that signs in on ``page``
+        directory: Where state files are kept
+        ttl: Seconds a state file is reused before logging in again
+        auth_cookies: Names of the sign-in cookies; a state file also expires
+            with the first of them (default: only ``ttl`` counts)
+    """
+
+    def __init__(
+        self,
+        login: Callable[["Page", str], Awaitable[None]] | None = None,
+        directory: str | Path = ".auth",
+        ttl: float = 30 * 60,
+        auth_cookies: Iterable[str] = (),
+    ):
+        self.login = login
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.auth_cookies = set(auth_cookies)
+        self.stats = {"reused": 0, "logins": 0, "invalidated": 0}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, identity: str, browser: "Browser") -> str:
+        """Return a valid storage state file for ``identity``, logging in if needed."""
+        path = self._path(identity)
+        if self._is_fresh(path):
+            self.stats["reused"] += 1
+            return str(path)
+
+        # One login per identity in this process, and across processes via the lock file
+        lock = self._locks.setdefault(identity, asyncio.Lock())
+        async with lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            async with _FileLock(path.with_suffix(".lock")):
+                if self._is_fresh(path):
+                    self.stats["reused"] += 1
+                    return str(path)
+                await self._login(identity, browser, path)
+                self.stats["logins"] += 1
+                return str(path)
+
+    def invalidate(self, identity: str) -> None:
+        """Forget the state of ``identity``, e.g. after a 401 response."""
+        try:
+            self._path(identity).unlink()
+            self.stats["invalidated"] += 1
+        except FileNotFoundError:
+            pass
+
+    async def _login(self, identity: str, browser: "Browser", path: Path) -> None:
+        if self.login is None:
+            raise RuntimeError("StorageStateCache.login is not set; pass your login function first.")
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
+            await self.login(page, identity)
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            await context.storage_state(path=tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            await context.close()
+
+    def _path(self, identity: str) -> Path:
+        return self.directory / (re.sub(r"[^\w.-]", "_", identity) + ".json")
+
+    def _is_fresh(self, path: Path) -> bool:
+        try:
+            expires = path.stat().st_mtime + self.ttl
+            state = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return False
+        # Only the sign-in cookies count: an analytics or consent cookie expiring
+        # soon must not force a new login. Session cookies have expires == -1.
+        cookie_expiry = [
+            cookie["expires"] for cookie in state.get("cookies", [])
+            if cookie["name"] in self.auth_cookies and cookie.get("expires", -1) > 0
+        ]
+        if cookie_expiry:
+            expires = min(expires, min(cookie_expiry))
+        return time.time() < expires
+
+
+def rejects_sign_in(response: "Response") -> bool:
+    """Whether ``response`` is a 401 from the app itself rather than from a third-party request."""
+    if response.status != 401:
+        return False
+    try:
+        frame = response.frame
+    except Exception:
+        return False  # service worker requests have no frame
+    if response.request.is_navigation_request() and frame.parent_frame is None:
+        return True
+    return _origin(response.url) == _origin(frame.page.url)
+
+
+def _origin(url: str) -> tuple[str, str]:
+    parts = urlsplit(url)
+    return parts.scheme, parts.netloc
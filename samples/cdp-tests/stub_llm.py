@@ -0,0 +1,80 @@
+"""
+Stub LLM for offline Browser-Use runs.
+
+StubChatModel stands in for ChatAzureOpenAI: each call waits ``latency``
+seconds, to mimic model time, and answers with a ``done`` action carrying
+canned structured output. Agents still drive real remote browsers, so batch
+throughput (sessions, navigation, agent overhead) can be measured without an
+LLM deployment or token cost.
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    python Browser-Use-Remote.py --batch tasks.txt --stub-llm --stub-latency 2
+
+    from stub_llm import StubChatModel
+
+    agent = Agent(task=..., llm=StubChatModel(latency=0.5), use_judge=False, ...)
+"""
+
+import asyncio
+from typing import Any
+
+# Returned by every ``done`` action unless other results are given
+CANNED_RESULTS = {
+    "items": [
+        {
+            "name": "Stub Wireless Mouse",
+            "price": "$19.99",
+            "rating": "4.5 out of 5 stars",
+            "reviews": "1,234",
+            "url": "https://www.amazon.com/dp/STUB000001",
+        },
+    ],
+}
+
+
+class StubChatModel:
+    """
+    Chat model with browser-use's ``BaseChatModel`` interface that needs no network.
+
+    Args:
+        latency: Seconds each call takes
+        results: Data of the structured ``done`` action (default: CANNED_RESULTS)
+    """
+
+    _verified_api_keys = True  # nothing to verify, skip the agent's key check
+
+    def __init__(self, latency: float = 1.0, results: dict[str, Any] | None = None):
+        self.model = "stub"
+        self.latency = latency
+        self.results = results if results is not None else CANNED_RESULTS
+        self.calls = 0
+
+    @property
+    def provider(self) -> str:
+        return "stub"
+
+    @property
+    def name(self) -> str:
+        return self.model
+
+    @property
+    def model_name(self) -> str:
+        return self.model
+
+    async def ainvoke(self, messages: list, output_format: type | None = None, **kwargs):
+        """Wait ``latency`` seconds, then finish the task with the canned results."""
+        from browser_use.llm.views import ChatInvokeCompletion
+
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if output_format is None:
+            return ChatInvokeCompletion(completion="Done.", usage=None)
+        completion = output_format.model_validate({
+            "evaluation_previous_goal": "Stub model: nothing to evaluate",
+            "memory": "",
+            "next_goal": "Return the canned results",
+            "action": [{"done": {"success": True, "data": self.results}}],
+        })
+        return ChatInvokeCompletion(completion=completion, usage=None)
@@ -0,0 +1,367 @@
+"""
+Stub Playwright Service - Microsoft Playwright Service
+
+A local stand-in for the service, so provisioning throughput, retries and
+pooling can be exercised offline and in CI.
+
+----------------------------------------
+📌 What It Serves
+----------------------------------------
+GET  /playwrightworkspaces/{workspaceId}/browsers        (REST, get_cdp_endpoint())
+     -> {"sessionUrl": "ws://127.0.0.1:<port>/sessions/<id>"}
+WS   /sessions/{id}                                       (connect_over_cdp)
+     -> CDP, proxied to one locally launched headless Chromium
+WS   /playwrightworkspaces/{workspaceId}/browsers         (connect_options, get_connect_options())
+     -> Playwright protocol, proxied to a local ``playwright run-server``
+
+Every provisioning request (REST, or the Playwright-protocol WebSocket) goes
+through the same fault injection:
+
+- ``latency_ms`` (+ up to ``jitter_ms``) before answering
+- ``rate_limit`` sessions per second (token bucket, burst of one second):
+  answered 429 with Retry-After
+- ``max_sessions`` open (or provisioned, not yet connected) browser sessions:
+  answered 429
+- ``error_rate``: fraction answered 503
+
+The browser backends start on first use, so REST-only benchmarks need no
+browser installed.
+
+----------------------------------------
+📌 Prerequisites
+----------------------------------------
+pip install -r requirements.txt
+playwright install chromium        (only for the WebSocket endpoints)
+
+----------------------------------------
+📌 How to Use
+----------------------------------------
+    python stub_service.py --port 8765 --latency-ms 300 --error-rate 0.05 --rate-limit 10
+
+    # CDP samples (test_runner.py, connectOverCDPScript.py, ...)
+    export PLAYWRIGHT_SERVICE_URL="wss://local.api.playwright.microsoft.com/playwrightworkspaces/stub/browsers"
+    export PLAYWRIGHT_SERVICE_API_URL="http://127.0.0.1:8765"
+    export PLAYWRIGHT_SERVICE_ACCESS_TOKEN="stub"
+
+    # connect() samples (playwright-pytest, playwright-python)
+    export PLAYWRIGHT_SERVICE_URL="ws://127.0.0.1:8765/playwrightworkspaces/stub/browsers"
+
+In-process, e.g. from a benchmark:
+
+    async with StubService(latency_ms=200) as service:
+        cdp_url = await get_cdp_endpoint(STUB_SERVICE_URL, "stub", api_base_url=service.url)
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import uuid
+import weakref
+from pathlib import Path
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+# Service URL that routes get_cdp_endpoint() to the stub together with api_base_url
+STUB_SERVICE_URL = "wss://local.api.playwright.microsoft.com/playwrightworkspaces/stub/browsers"
+
+# Seconds a provisioned session counts towards max_sessions before it is connected
+PENDING_SESSION_TTL = 60
+
+
+class _TokenBucket:
+    """``rate`` admissions per second, with bursts of up to one second's worth."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class StubService:
+    """
+    Local Playwright Service stand-in with latency, error and throttling injection.
+
+    Args:
+        host, port: Where to listen (port 0 picks a free port, see ``url``)
+        latency_ms: Delay before each provisioning answer
+        jitter_ms: Extra random delay, uniformly 0..jitter_ms
+        error_rate: Fraction of provisioning requests answered 503
+        rate_limit: Sessions per second before answering 429 (0 = unlimited)
+        max_sessions: Open or provisioned sessions before answering 429 (0 = unlimited)
+        handshake_ms: Extra delay on the first request of each connection,
+            like a TLS handshake
+        chromium_path: Chromium to launch for CDP sessions (default: Playwright's)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0,
+        max_sessions: int = 0,
+        handshake_ms: float = 0,
+        chromium_path: str | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.max_sessions = max_sessions
+        self.handshake_ms = handshake_ms
+        self.chromium_path = chromium_path
+        self.url: str | None = None  # http://host:port once started
+        self.stats = {"requests": 0, "provisioned": 0, "throttled": 0, "errors": 0, "open_sessions": 0, "peak_sessions": 0}
+
+        self._bucket = _TokenBucket(rate_limit) if rate_limit else None
+        self._pending: dict[str, float] = {}  # provisioned session id -> time, until connected
+        self._seen_transports = weakref.WeakSet()
+        self._sockets: set[web.WebSocketResponse] = set()  # open client connections
+        self._runner: web.AppRunner | None = None
+        self._backend_lock = asyncio.Lock()
+        self._chromium: asyncio.subprocess.Process | None = None
+        self._chromium_url: str | None = None
+        self._user_data_dir: str | None = None
+        self._run_server: asyncio.subprocess.Process | None = None
+        self._run_server_url: str | None = None
+
+    async def __aenter__(self) -> "StubService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start listening; browser backends start with their first session."""
+        app = web.Application()
+        app.router.add_get("/playwrightworkspaces/{workspace_id}/browsers", self._browsers)
+        app.router.add_get("/sessions/{session_id}", self._cdp_session)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{self.port}"
+
+    async def close(self) -> None:
+        """Stop the server and the browser backends."""
+        # Proxied sessions stay open until a side closes; the server shutdown would wait for them
+        for socket in list(self._sockets):
+            await socket.close(code=WSCloseCode.GOING_AWAY)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        for process in (self._chromium, self._run_server):
+            if process is not None and process.returncode is None:
+                _terminate(process)
+                await process.wait()
+        self._chromium = self._run_server = None
+        self._chromium_url = self._run_server_url = None
+        if self._user_data_dir is not None:
+            shutil.rmtree(self._user_data_dir, ignore_errors=True)
+            self._user_data_dir = None
+
+    async def _admit(self, request: web.Request) -> web.Response | None:
+        """Apply the injected faults; return an error response or None to admit."""
+        self.stats["requests"] += 1
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"error": "Missing access token"}, status=401)
+        if self.handshake_ms and request.transport not in self._seen_transports:
+            self._seen_transports.add(request.transport)
+            await asyncio.sleep(self.handshake_ms / 1000)
+        if self._bucket is not None and not self._bucket.take():
+            self.stats["throttled"] += 1
+            retry_after = max(1, round(1 / self._bucket.rate))
+            return web.json_response({"error": "Too many requests"}, status=429, headers={"Retry-After": str(retry_after)})
+        if self.max_sessions and self.stats["open_sessions"] + self._pending_count() >= self.max_sessions:
+            self.stats["throttled"] += 1
+            return web.json_response({"error": "Session limit reached"}, status=429, headers={"Retry-After": "1"})
+
+        await asyncio.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+        if random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"error": "Injected failure"}, status=503)
+        self.stats["provisioned"] += 1
+        return None
+
+    def _pending_count(self) -> int:
+        """Provisioned sessions not yet connected; like the service, unused ones expire."""
+        expired = time.monotonic() - PENDING_SESSION_TTL
+        for session_id in [session_id for session_id, created in self._pending.items() if created < expired]:
+            del self._pending[session_id]
+        return len(self._pending)
+
+    async def _browsers(self, request: web.Request) -> web.StreamResponse:
+        error = await self._admit(request)
+        if error is not None:
+            return error
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            # connect(): the Playwright protocol on this very URL
+            upstream = await self._run_server_endpoint()
+            headers = {name: value for name, value in request.headers.items() if name.lower().startswith("x-playwright")}
+            return await self._proxy(request, upstream, headers)
+
+        session_id = uuid.uuid4().hex
+        self._pending[session_id] = time.monotonic()
+        return web.json_response({"sessionUrl": f"ws://{request.host}/sessions/{session_id}"})
+
+    async def _cdp_session(self, request: web.Request) -> web.StreamResponse:
+        session_id = request.match_info["session_id"]
+        if self._pending.pop(session_id, None) is None:
+            return web.json_response({"error": "Unknown or already used session"}, status=404)
+        try:
+            upstream = await self._chromium_endpoint()
+        except (OSError, RuntimeError) as e:
+            return web.json_response({"error": f"Local Chromium unavailable: {e}"}, status=502)
+        return await self._proxy(request, upstream)
+
+    async def _proxy(self, request: web.Request, upstream_url: str, headers: dict[str, str] | None = None) -> web.StreamResponse:
+        """Relay messages between the client and ``upstream_url`` until either side closes."""
+        import aiohttp
+
+        async with aiohttp.ClientSession() as session:
+            try:
+                upstream = await session.ws_connect(upstream_url, headers=headers, max_msg_size=0)
+            except aiohttp.ClientError as e:
+                return web.json_response({"error": f"Browser backend unavailable: {e}"}, status=502)
+
+            client = web.WebSocketResponse(max_msg_size=0)
+            await client.prepare(request)
+            self._sockets.add(client)
+            self.stats["open_sessions"] += 1
+            self.stats["peak_sessions"] = max(self.stats["peak_sessions"], self.stats["open_sessions"])
+
+            async def pump(source, target) -> None:
+                async for message in source:
+                    if message.type == WSMsgType.TEXT:
+                        await target.send_str(message.data)
+                    elif message.type == WSMsgType.BINARY:
+                        await target.send_bytes(message.data)
+                    else:
+                        break
+
+            pumps = [asyncio.create_task(pump(client, upstream)), asyncio.create_task(pump(upstream, client))]
+            try:
+                await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in pumps:
+                    task.cancel()
+                await asyncio.gather(*pumps, return_exceptions=True)
+                await upstream.close()
+                await client.close()
+                self._sockets.discard(client)
+                self.stats["open_sessions"] -= 1
+            return client
+
+    async def _chromium_endpoint(self) -> str:
+        """Browser-level CDP URL of the local Chromium, launching it on first use."""
+        async with self._backend_lock:
+            if self._chromium_url is None:
+                executable = self.chromium_path or await _playwright_chromium()
+                self._user_data_dir = tempfile.mkdtemp(prefix="stub-service-")
+                self._chromium = await asyncio.create_subprocess_exec(
+                    executable, "--headless=new", "--remote-debugging-port=0", "--no-first-run",
+                    "--no-default-browser-check", f"--user-data-dir={self._user_data_dir}", "about:blank",
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL, start_new_session=True,
+                )
+                # Chromium writes its port and browser target path once it listens
+                port_file = Path(self._user_data_dir) / "DevToolsActivePort"
+                for _ in range(300):
+                    if port_file.exists() and len(port_file.read_text().split()) == 2:
+                        port, path = port_file.read_text().split()
+                        self._chromium_url = f"ws://127.0.0.1:{port}{path}"
+                        break
+                    if self._chromium.returncode is not None:
+                        break
+                    await asyncio.sleep(0.1)
+                else:
+                    _terminate(self._chromium)
+                if self._chromium_url is None:
+                    raise RuntimeError(f"Chromium at {executable} did not start a DevTools endpoint")
+            return self._chromium_url
+
+    async def _run_server_endpoint(self) -> str:
+        """URL of a local ``playwright run-server``, starting it on first use."""
+        async with self._backend_lock:
+            if self._run_server_url is None:
+                self._run_server = await asyncio.create_subprocess_exec(
+                    sys.executable, "-m", "playwright", "run-server", "--host", "127.0.0.1", "--port", "0",
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, start_new_session=True,
+                )
+                line = await asyncio.wait_for(self._run_server.stdout.readline(), 30)
+                # "Listening on ws://127.0.0.1:<port>/"
+                self._run_server_url = line.decode().strip().rsplit(" ", 1)[-1]
+            return self._run_server_url
+
+
+def _terminate(process: asyncio.subprocess.Process) -> None:
+    """Stop a backend and its children (``python -m playwright`` runs the driver as a child)."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError):  # Windows, or already gone
+        process.terminate()
+
+
+async def _playwright_chromium() -> str:
+    """Executable of the Chromium installed by ``playwright install chromium``."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        return p.chromium.executable_path
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for Microsoft Playwright Service")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (0 = any free port)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before each provisioning answer")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random delay, 0..jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Sessions per second before 429 (0 = unlimited)")
+    parser.add_argument("--max-sessions", type=int, default=0, help="Open sessions before 429 (0 = unlimited)")
+    parser.add_argument("--chromium", help="Chromium executable (default: Playwright's)")
+    args = parser.parse_args()
+
+    service = StubService(
+        host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit=args.rate_limit, max_sessions=args.max_sessions,
+        chromium_path=args.chromium,
+    )
+    async with service:
+        print(f"🧪 Stub Playwright Service on {service.url}")
+        print(f"   CDP samples:       PLAYWRIGHT_SERVICE_URL={STUB_SERVICE_URL}")
+        print(f"                      PLAYWRIGHT_SERVICE_API_URL={service.url}")
+        print(f"   connect() samples: PLAYWRIGHT_SERVICE_URL=ws://{args.host}:{service.port}/playwrightworkspaces/stub/browsers")
+        try:
+            while True:
+                await asyncio.sleep(10)
+                print(f"📊 {service.stats}")
+        except asyncio.CancelledError:
+            pass
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -20,8 +20,12 @@ Run Playwright tests on remote browsers via CDP (Chrome DevTools Protocol).
 ----------------------------------------
 📌 How to Use
 ----------------------------------------
-1️⃣ Run as a standalone script:
+1️⃣ Run as a standalone script (tests run concurrently, slowest first):
     python test_runner.py
+    python test_runner.py --reuse-browser    # one remote browser, a context per test
+    python test_runner.py --workers 10    # match your parallel browser quota
+    python test_runner.py --timings --timings-file timings.jsonl
+    python test_runner.py --profile --profile-file round-trips.folded
 
 2️⃣ Run with pytest:
     pytest test_runner.py -v
@@ -32,19 +36,71 @@ Run Playwright tests on remote browsers via CDP (Chrome DevTools Protocol).
     async with remote_page() as page:
         await page.goto("https://example.com")
         assert await page.title() == "Example Domain"
+
+4️⃣ Sign in once per identity and reuse the state in every test:
+    from test_runner import storage_states, remote_page
+    
+    async def login(page, identity):
+        await page.goto("https://example.com/login")
+        ...
+    
+    storage_states.login = login
+    async with remote_page(identity="alice") as page:
+        ...
+
+5️⃣ Skip images, fonts and third-party requests in structure-only tests:
+    async with remote_page(block="structure-only") as page:
+        ...
+    
+    python test_runner.py --block-resources off    # record the baseline savings are estimated from
+
+6️⃣ Run read-only checks against one loaded page instead of a page each:
+    from test_runner import run_checks
+    
+    results = await run_checks("https://example.com", {"title": check_title, "footer": check_footer})
+
+7️⃣ Reuse one remote browser across tests (each test still gets its own context):
+    from test_runner import shared_browser, remote_page
+    
+    async with shared_browser():
+        async with remote_page() as page:
+            ...
 """
 
+import argparse
 import asyncio
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
-from playwright.async_api import async_playwright, Browser, Page
-from dotenv import load_dotenv
+import io
+import json
+import sys
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncGenerator, Awaitable, Callable
+
+# Import the shared module (settings and .env are loaded on first use)
+from playwright_service_client import SupervisedBrowser, get_cdp_endpoint, get_config, get_playwright, timings
+from artifact_writer import ArtifactWriter
+from storage_state_cache import StorageStateCache, rejects_sign_in
+from round_trip_profiler import RoundTripProfiler
+from resource_blocker import ResourceBlocking, describe
+from navigation import navigate, navigation_waits
+
+if TYPE_CHECKING:
+    # Only for annotations; playwright itself is loaded when the driver starts
+    from playwright.async_api import Browser, BrowserContext, Page
+
+# Screenshots are written in the background under a shared memory budget
+artifacts = ArtifactWriter("test-results/screenshots")
 
-# Load environment variables from .env file
-load_dotenv()
+# Blocking profiles for remote_page(block=...); learn=True records the baseline instead
+resource_blocking = ResourceBlocking(Path(__file__).with_name(".resource_baseline.json"))
 
-# Import the shared module
-from playwright_service_client import get_cdp_endpoint
+# Profile for remote_page() calls that don't pass block=
+default_block: str | None = None
+
+# Protocol round trips per test step; enable with PLAYWRIGHT_SERVICE_PROFILE=1 or --profile
+round_trips = RoundTripProfiler(enabled=False)
 
 
 # ============================================================================
@@ -52,7 +108,7 @@ from playwright_service_client import get_cdp_endpoint
 # ============================================================================
 
 @asynccontextmanager
-async def remote_browser() -> AsyncGenerator[Browser, None]:
+async def remote_browser() -> AsyncGenerator["Browser", None]:
     """
     Context manager for quick access to a remote browser.
     
@@ -61,35 +117,211 @@ async def remote_browser() -> AsyncGenerator[Browser, None]:
             page = await browser.new_page()
             await page.goto("https://example.com")
     """
-    cdp_url = await get_cdp_endpoint()
-    async with async_playwright() as p:
-        browser = await p.chromium.connect_over_cdp(
-            cdp_url,
-            headers={"User-Agent": "Chrome-DevTools-Protocol/1.3"}
-        )
+    with timings.session():
+        cdp_url = await get_cdp_endpoint()
+        p = await get_playwright()
+        with timings.phase("cdp_connect"):
+            browser = await p.chromium.connect_over_cdp(
+                cdp_url,
+                headers={"User-Agent": "Chrome-DevTools-Protocol/1.3"}
+            )
+        round_trips.attach(browser)
         try:
             yield browser
         finally:
             await browser.close()
 
 
+class SharedBrowser:
+    """
+    One remote browser kept connected for a whole test session.
+    
+    Each test gets a fresh BrowserContext, so cookies, storage and pages stay
+    isolated while the endpoint request, driver start and CDP handshake are
+    paid only once. The browser is supervised: keepalives stop the session
+    from idling out between tests, and a dropped socket is reprovisioned with
+    backoff before the next context is created.
+    """
+    
+    def __init__(self):
+        self._supervised = SupervisedBrowser(on_connect=round_trips.attach)
+        self._started = False
+    
+    @property
+    def reconnects(self) -> int:
+        return self._supervised.stats["reconnects"]
+    
+    async def browser(self) -> "Browser":
+        """Return the connected browser, waiting for a reconnect in progress."""
+        if not self._started:
+            self._started = True
+            await self._supervised.start()
+        return await self._supervised.browser()
+    
+    @asynccontextmanager
+    async def context(self, **context_options) -> AsyncGenerator["BrowserContext", None]:
+        """Create an isolated context on the shared browser."""
+        browser = await self.browser()
+        try:
+            with timings.phase("new_context"):
+                context = await browser.new_context(**context_options)
+        except Exception:
+            if browser.is_connected():
+                raise
+            # Socket dropped between the check and the call: wait for the reconnect
+            browser = await self.browser()
+            with timings.phase("new_context"):
+                context = await browser.new_context(**context_options)
+        try:
+            yield context
+        finally:
+            if browser.is_connected():
+                await context.close()
+    
+    async def close(self) -> None:
+        """Close the shared browser."""
+        await self._supervised.close()
+
+
+# Set while a shared_browser() block is active
+_shared: SharedBrowser | None = None
+
+
+@asynccontextmanager
+async def shared_browser() -> AsyncGenerator[SharedBrowser, None]:
+    """
+    Session scope in which remote_page() reuses one connected browser.
+    
+    Example:
+        async with shared_browser():
+            await test_example_domain()
+            await test_navigation()
+    """
+    global _shared
+    if _shared is not None:
+        yield _shared
+        return
+    
+    _shared = SharedBrowser()
+    try:
+        yield _shared
+    finally:
+        shared, _shared = _shared, None
+        await shared.close()
+
+
+# Signed-in states per identity; set storage_states.login before using
+# remote_page(identity=...), and storage_states.auth_cookies to also expire
+# states with their sign-in cookies
+storage_states = StorageStateCache(directory=Path(__file__).with_name(".auth"))
+
+
+async def _context_options(identity: str | None, browser: "Browser") -> dict:
+    if identity is None:
+        return {}
+    return {"storage_state": await storage_states.get(identity, browser)}
+
+
+def _watch_auth_failures(context: "BrowserContext", identity: str | None) -> None:
+    """Drop the cached state of ``identity`` as soon as the app (not a third party) rejects it."""
+    if identity is None:
+        return
+    
+    def on_response(response):
+        if rejects_sign_in(response):
+            storage_states.invalidate(identity)
+    
+    context.on("response", on_response)
+
+
+@asynccontextmanager
+async def _blocking(context: "BrowserContext", block: str | None) -> AsyncGenerator[None, None]:
+    """Apply a blocking profile to ``context`` and print what it saved."""
+    saved = await resource_blocking.attach(context, block if block is not None else default_block)
+    try:
+        yield
+    finally:
+        if saved["blocked"]:
+            print(f"🚫 {saved['profile']}: {describe(saved)}")
+
+
 @asynccontextmanager
-async def remote_page() -> AsyncGenerator[Page, None]:
+async def remote_page(identity: str | None = None, block: str | None = None) -> AsyncGenerator["Page", None]:
     """
     Context manager for quick access to a remote page.
     
+    Inside a shared_browser() block the page is opened in a new context on
+    the shared browser; otherwise a dedicated browser is connected.
+    
+    Args:
+        identity: Start signed in as this identity; the login runs once and
+            its storage state is reused (see ``storage_states``)
+        block: Resource blocking profile of the context: ``structure-only``,
+            ``no-media`` or ``no-third-party`` (default: ``default_block``)
+    
     Example:
         async with remote_page() as page:
             await page.goto("https://example.com")
             assert await page.title() == "Example Domain"
     """
-    async with remote_browser() as browser:
-        context = await browser.new_context()
-        page = await context.new_page()
-        try:
-            yield page
-        finally:
-            await context.close()
+    with timings.session():
+        if _shared is not None:
+            options = await _context_options(identity, await _shared.browser())
+            async with _shared.context(**options) as context, _blocking(context, block):
+                _watch_auth_failures(context, identity)
+                with timings.phase("new_page"):
+                    page = await context.new_page()
+                yield page
+            return
+        
+        async with remote_browser() as browser:
+            options = await _context_options(identity, browser)
+            with timings.phase("new_context"):
+                context = await browser.new_context(**options)
+            _watch_auth_failures(context, identity)
+            try:
+                async with _blocking(context, block):
+                    with timings.phase("new_page"):
+                        page = await context.new_page()
+                    yield page
+            finally:
+                await context.close()
+
+
+async def run_checks(
+    url: str,
+    checks: dict[str, Callable[["Page"], Awaitable[None]]],
+    identity: str | None = None,
+    block: str | None = None,
+) -> dict[str, Exception | None]:
+    """
+    Run read-only checks against one loaded page.
+    
+    The page is opened and navigated once, then every check runs against it in
+    turn; a failing check doesn't stop the others. Checks must not navigate or
+    change the page.
+    
+    Returns:
+        Check name -> None if it passed, or the exception it raised
+    
+    Example:
+        results = await run_checks("https://example.com", {
+            "title": lambda page: expect(page).to_have_title("Example Domain"),
+            "heading": lambda page: expect(page.locator("h1")).to_be_visible(),
+        })
+    """
+    results: dict[str, Exception | None] = {}
+    async with remote_page(identity, block) as page:
+        await page.goto(url)
+        for name, check in checks.items():
+            try:
+                await check(page)
+                results[name] = None
+                print(f"  ✅ {name}")
+            except Exception as e:
+                results[name] = e
+                print(f"  ❌ {name}: {e}")
+    return results
 
 
 # ============================================================================
@@ -98,7 +330,7 @@ async def remote_page() -> AsyncGenerator[Page, None]:
 
 async def test_example_domain():
     """Test that example.com loads correctly."""
-    async with remote_page() as page:
+    async with remote_page(block="structure-only") as page:
         await page.goto("https://example.com")
         
         title = await page.title()
@@ -116,14 +348,34 @@ async def test_navigation():
         await page.goto("https://example.com")
         initial_url = page.url
         
-        # Click the "More information..." link
-        await page.click("a")
-        await page.wait_for_load_state("networkidle")
+        # Click the "More information..." link; done as soon as the URL changes
+        await navigate(page, lambda: page.click("a"), label="Navigation")
         
         assert page.url != initial_url, "URL should have changed after clicking link"
         print("✅ test_navigation passed!")
 
 
+async def test_example_domain_smoke():
+    """Read-only checks sharing one loaded page."""
+    async def has_title(page: "Page"):
+        assert await page.title() == "Example Domain"
+    
+    async def has_heading(page: "Page"):
+        assert await page.locator("h1").text_content() == "Example Domain"
+    
+    async def has_link(page: "Page"):
+        assert await page.locator("a").count() > 0, "Expected at least one link"
+    
+    results = await run_checks("https://example.com", {
+        "title": has_title,
+        "heading": has_heading,
+        "link": has_link,
+    }, block="structure-only")
+    failed = [name for name, error in results.items() if error is not None]
+    assert not failed, f"{len(failed)}/{len(results)} checks failed: {', '.join(failed)}"
+    print(f"✅ test_example_domain_smoke passed! ({len(results)} checks, 1 page)")
+
+
 async def test_screenshot():
     """Test taking a screenshot."""
     async with remote_page() as page:
@@ -132,41 +384,189 @@ async def test_screenshot():
         screenshot = await page.screenshot()
         assert len(screenshot) > 0, "Screenshot should not be empty"
         
-        print(f"✅ test_screenshot passed! ({len(screenshot)} bytes)")
+        # Queued for a writer thread; the test doesn't wait on the disk
+        path = await artifacts.write("example-domain.png", screenshot)
+        print(f"✅ test_screenshot passed! ({len(screenshot)} bytes -> {path})")
 
 
 # ============================================================================
 # Test Runner
 # ============================================================================
 
-async def run_all_tests():
-    """Run all example tests."""
+# Durations from previous runs, used to schedule the slowest tests first
+DURATIONS_FILE = Path(__file__).with_name(".test_durations.json")
+
+# Output buffer of the test running in the current task (None = real stdout).
+# Tasks started by a test inherit it; once the test's output has been printed
+# the buffer is closed and their output goes to real stdout instead.
+_test_output: ContextVar[io.StringIO | None] = ContextVar("_test_output", default=None)
+
+
+class _TaskLocalStdout(io.TextIOBase):
+    """Send print() output of each running test to that test's own buffer."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text: str) -> int:
+        buffer = _test_output.get()
+        if buffer is None or buffer.closed:
+            return self._stream.write(text)
+        return buffer.write(text)
+    
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+def _load_durations(path: Path) -> dict[str, float]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_durations(path: Path, durations: dict[str, float]) -> None:
+    try:
+        path.write_text(json.dumps({**_load_durations(path), **durations}, indent=2))
+    except OSError as e:
+        print(f"⚠️  Could not save test durations: {e}")
+
+
+async def _run_test(name: str, test_func, semaphore: asyncio.Semaphore) -> tuple[str, bool, float, str]:
+    """Run one test under the semaphore, capturing its output."""
+    async with semaphore:
+        buffer = io.StringIO()
+        token = _test_output.set(buffer)
+        start = time.perf_counter()
+        try:
+            print(f"\n📋 {name}")
+            print("-" * 30)
+            try:
+                with round_trips.test(name):
+                    await test_func()
+                ok = True
+            except Exception as e:
+                print(f"❌ Failed: {e}")
+                ok = False
+        finally:
+            _test_output.reset(token)
+        output = buffer.getvalue()
+        buffer.close()
+        return name, ok, time.perf_counter() - start, output
+
+
+async def run_all_tests(
+    reuse_browser: bool = False,
+    max_parallel: int | None = None,
+    longest_first: bool = True,
+    durations_file: Path | None = DURATIONS_FILE,
+    timings_file: str | None = None,
+    profile_file: str | None = None,
+):
+    """
+    Run all example tests concurrently.
+    
+    Args:
+        reuse_browser: Share one remote browser across tests, each in its own
+            context, instead of connecting a browser per test (default: False)
+        max_parallel: Tests running at once; match your workspace's parallel
+            browser quota (default: PLAYWRIGHT_SERVICE_MAX_PARALLEL or 4)
+        longest_first: Start the slowest tests of the previous run first
+        durations_file: Where test durations are read and saved (None to disable)
+        timings_file: Append session timing percentiles to this JSON lines file
+            (default: PLAYWRIGHT_SERVICE_TIMINGS_FILE)
+        profile_file: Write round trips per test step as folded stacks for a
+            flame graph (requires round_trips.enabled)
+    """
+    if max_parallel is None:
+        max_parallel = get_config().max_parallel
+    timings_file = timings_file or get_config().timings_file
+    if get_config().profile:
+        round_trips.enabled = True
+    
     print("=" * 50)
     print("🧪 Running Playwright Service Tests")
     print("=" * 50)
     
     tests = [
         ("Example Domain", test_example_domain),
+        ("Example Domain (smoke)", test_example_domain_smoke),
         ("Navigation", test_navigation),
         ("Screenshot", test_screenshot),
     ]
     
+    if longest_first and durations_file is not None:
+        previous = _load_durations(durations_file)
+        # Unknown tests go first: they may be the slow ones
+        tests.sort(key=lambda test: previous.get(test[0], float("inf")), reverse=True)
+    
     passed = failed = 0
+    durations = {}
+    semaphore = asyncio.Semaphore(max_parallel)
+    start = time.perf_counter()
     
-    for name, test_func in tests:
-        print(f"\n📋 {name}")
-        print("-" * 30)
-        try:
-            await test_func()
-            passed += 1
-        except Exception as e:
-            print(f"❌ Failed: {e}")
-            failed += 1
+    stdout = sys.stdout
+    sys.stdout = _TaskLocalStdout(stdout)
+    try:
+        async with AsyncExitStack() as stack:
+            # Start the driver and connect the shared browser before any test's
+            # clock starts, so the first test's recorded duration excludes them
+            try:
+                if reuse_browser:
+                    shared = await stack.enter_async_context(shared_browser())
+                    with timings.session():
+                        await shared.browser()
+                else:
+                    await get_playwright()
+            except Exception as e:
+                # No test can run without it: fail them all and still print the summary
+                print(f"\n❌ Could not start the remote browser session: {e}")
+                for name, _ in tests:
+                    print(f"❌ {name}: not run")
+                failed = len(tests)
+            else:
+                tasks = [asyncio.create_task(_run_test(name, func, semaphore)) for name, func in tests]
+                for next_done in asyncio.as_completed(tasks):
+                    name, ok, duration, output = await next_done
+                    # Print each test's output in one piece as it finishes
+                    print(output, end="")
+                    durations[name] = round(duration, 3)
+                    if ok:
+                        passed += 1
+                    else:
+                        failed += 1
+            
+            await artifacts.flush()
+    finally:
+        sys.stdout = stdout
+    
+    if durations_file is not None:
+        _save_durations(durations_file, durations)
+    resource_blocking.save()
     
     print(f"\n{'=' * 50}")
     print(f"📊 Results: {passed} passed, {failed} failed")
+    print(f"⏱️  Wall time: {time.perf_counter() - start:.2f}s ({max_parallel} parallel)")
     print("=" * 50)
     
+    if navigation_waits.records:
+        navigation_waits.report()
+    
+    if resource_blocking.stats["blocked"]:
+        print(f"🚫 Resource blocking: {describe(resource_blocking.stats)}")
+    
+    if timings.enabled and timings.sessions:
+        timings.report()
+        if timings_file:
+            timings.write_jsonl(timings_file)
+            print(f"📝 Timings appended to {timings_file}")
+    
+    if round_trips.enabled and round_trips.calls:
+        round_trips.report()
+        if profile_file:
+            round_trips.write_folded(profile_file)
+            print(f"📝 Folded stacks written to {profile_file}")
+    
     return failed == 0
 
 
@@ -175,6 +575,33 @@ async def run_all_tests():
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the example tests on Microsoft Playwright Service")
+    parser.add_argument("--workers", type=int, help="Tests running at once (default: PLAYWRIGHT_SERVICE_MAX_PARALLEL or 4)")
+    parser.add_argument("--reuse-browser", action="store_true", help="Share one remote browser across tests (a context each)")
+    parser.add_argument("--no-longest-first", action="store_true", help="Run tests in declaration order")
+    parser.add_argument("--timings", action="store_true", help="Report per-phase session timing percentiles")
+    parser.add_argument("--timings-file", help="Append timing percentiles to a JSON lines file")
+    parser.add_argument("--block-resources", choices=["structure-only", "no-media", "no-third-party", "off"],
+                        help="Blocking profile for tests that don't choose one; 'off' disables blocking and records the baseline")
+    parser.add_argument("--profile", action="store_true", help="Report protocol round trips per test step")
+    parser.add_argument("--profile-file", help="Write round trips as folded stacks (flamegraph.pl, speedscope)")
+    args = parser.parse_args()
+    
+    if args.timings or args.timings_file:
+        timings.enabled = True
+    if args.profile or args.profile_file:
+        round_trips.enabled = True
+    if args.block_resources == "off":
+        resource_blocking.learn = True
+    elif args.block_resources:
+        default_block = args.block_resources
+    
     print("🧪 Playwright Testing - Microsoft Playwright Service\n")
-    success = asyncio.run(run_all_tests())
+    success = asyncio.run(run_all_tests(
+        reuse_browser=args.reuse_browser,
+        max_parallel=args.workers,
+        longest_first=not args.no_longest_first,
+        timings_file=args.timings_file,
+        profile_file=args.profile_file,
+    ))
     exit(0 if success else 1)
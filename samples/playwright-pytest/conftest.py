@@ -3,7 +3,23 @@ Global pytest configuration and fixtures for Playwright tests.
 """
 import pytest
 from playwright.sync_api import Page, expect
+import hashlib
+import inspect
+import json
 import os
+import re
+import shutil
+import statistics
+import time
+import uuid
+from typing import Optional
+
+import resource_blocker
+from resource_blocker import ResourceBlocking
+from route_cache import RouteCache
+from round_trip_profiler import RoundTripProfiler
+from screenshot_writer import ScreenshotWriter
+from storage_state_cache import StorageStateCache, rejects_sign_in
 
 # Load environment variables from .env file if it exists
 try:
@@ -13,42 +29,659 @@ except ImportError:
     pass  # python-dotenv not installed, use system env vars only
 
 
+# Connect options computed once per run on the controller (or the only process
+# without xdist) and handed to every xdist worker through workerinput.
+_CONNECT_OPTIONS_KEY = pytest.StashKey[Optional[dict]]()
+_WORKERINPUT_KEY = "playwright_connect_options"
+
+# Per-run observations read by run_tests.py --workers adaptive
+WORKER_STATS_FILE = os.path.join("test-results", "worker-stats.json")
+
+# Failure text that points at service throttling or dropped connections
+_THROTTLE_MARKERS = (
+    "429", "Too Many Requests", "throttl", "quota",
+    "ECONNRESET", "ECONNREFUSED", "WebSocket error", "socket hang up",
+)
+_worker_stats = {"tests": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "throttled": 0}
+
+# Per-test durations (setup + call + teardown) merged across runs, used to
+# balance tests over workers and shards longest-processing-time first
+DURATIONS_FILE = os.path.join("test-results", "durations.json")
+_run_durations: dict = {}
+
+# Per-test outcome, duration and source hash merged across runs, used by
+# --index-failed-first, --index-only-changed and --index-budget
+RESULTS_INDEX_FILE = os.path.join("test-results", "results-index.json")
+_run_results: dict = {}
+_source_cache: dict = {}
+_SOURCE_HASH_KEY = pytest.StashKey[str]()
+# What the index selected; computed where tests are collected (xdist workers)
+# and reported by the controller
+_index_selection: dict = {}
+
+# xdist --dist loadgroup appends "@<group>" to node IDs
+_GROUP_SUFFIX = re.compile(r"@balance\d+$")
+
+# URL sizes and page load times recorded with --block-resources off
+RESOURCE_BASELINE_FILE = os.path.join("test-results", "resource-baseline.json")
+_resource_savings: dict = {}
+
+# Protocol round trips per test step (--profile-round-trips)
+ROUND_TRIPS_DIR = os.path.join("test-results", "round-trips")
+round_trips = RoundTripProfiler(enabled=False)
+
+
+def _build_connect_options() -> Optional[dict]:
+    """Build and validate the Playwright Service connect options for this run."""
+    service_url = os.getenv("PLAYWRIGHT_SERVICE_URL")
+    if not service_url:
+        return None
+
+    # ws:// only for a local stand-in such as cdp-tests/stub_service.py
+    local = service_url.startswith(("ws://127.0.0.1", "ws://localhost"))
+    if not service_url.startswith("wss://") and not local:
+        raise pytest.UsageError(f"PLAYWRIGHT_SERVICE_URL must start with wss://, got: {service_url}")
+    access_token = os.getenv("PLAYWRIGHT_SERVICE_ACCESS_TOKEN")
+    if not access_token:
+        raise pytest.UsageError("PLAYWRIGHT_SERVICE_ACCESS_TOKEN must be set when PLAYWRIGHT_SERVICE_URL is set.")
+
+    # One run ID for the whole test session, shared by all xdist workers
+    run_id = os.getenv("PLAYWRIGHT_SERVICE_RUN_ID") or str(uuid.uuid4())
+
+    # Get OS information
+    os_name = 'linux'
+
+    # API version
+    api_version = "2025-09-01"
+
+    # Construct the WebSocket endpoint with query parameters
+    ws_endpoint = f"{service_url}?runId={run_id}&os={os_name}&api-version={api_version}"
+
+    print(f"🔗 WebSocket endpoint: {ws_endpoint}")
+
+    return {
+        "ws_endpoint": ws_endpoint,
+        "headers": {
+            "Authorization": f"Bearer {access_token}"
+        },
+        "timeout": 3 * 60 * 1000,  # 3 minutes
+        "expose_network": "<loopback>",  # Use loopback to expose network
+    }
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("playwright-service")
+    group.addoption("--shard", help="Run only shard I of N (e.g. 2/4), balanced by recorded durations")
+    group.addoption("--balance-workers", type=int, default=0,
+                    help="Pre-assign tests to N xdist workers longest-first (use with --dist loadgroup)")
+    group.addoption("--index-failed-first", action="store_true",
+                    help="Run tests that failed, changed or are new since the result index first")
+    group.addoption("--index-only-changed", action="store_true",
+                    help="Run only tests that failed, changed or are new since the result index")
+    group.addoption("--index-budget", type=float, default=0,
+                    help="Run the highest-value tests predicted to fit in this many seconds")
+    group.addoption("--block-resources", choices=[*resource_blocker.PROFILES, "off"],
+                    help="Blocking profile for tests without a block_resources marker; "
+                         "'off' disables blocking and records the baseline that savings are estimated from")
+    group.addoption("--profile-round-trips", action="store_true",
+                    help="Report Playwright protocol round trips and latency per test step")
+    group.addoption("--profile-file",
+                    help="Also write the round trips as folded stacks (flamegraph.pl, speedscope)")
+
+
 @pytest.fixture(scope="session")
-def connect_options():
+def connect_options(pytestconfig):
     """Configure connection to Playwright Service for remote browsers."""
-    service_url = os.getenv("PLAYWRIGHT_SERVICE_URL")
-    if service_url:
-        import uuid
-        
-        # Generate a unique run ID for this test session
-        run_id = os.getenv("PLAYWRIGHT_SERVICE_RUN_ID", str(uuid.uuid4()))
-        
-        # Get OS information
-        os_name = 'linux'
-        
-        # API version
-        api_version = "2025-09-01"
-        
-        # Construct the WebSocket endpoint with query parameters
-        ws_endpoint = f"{service_url}?runId={run_id}&os={os_name}&api-version={api_version}"
-        
-        print(f"🔗 WebSocket endpoint: {ws_endpoint}")
-        
-        connect_opts = {
-            "ws_endpoint": ws_endpoint,
-            "headers": {
-                "Authorization": f"Bearer {os.getenv('PLAYWRIGHT_SERVICE_ACCESS_TOKEN', '')}"
-            },
-            "timeout": 3 * 60 * 1000,  # 3 minutes
-            "expose_network": "<loopback>",  # Use loopback to expose network
-        }
-        return connect_opts
-    else:
+    connect_opts = pytestconfig.stash[_CONNECT_OPTIONS_KEY]
+    if connect_opts is None:
         print("🖥️  Using local browsers (PLAYWRIGHT_SERVICE_URL not set)")
+    return connect_opts
+
+
+@pytest.fixture(scope="session")
+def screenshot_writer():
+    """
+    Background screenshot writer for test-results/screenshots.
+
+    Example:
+        def test_home(page, screenshot_writer):
+            page.goto("https://playwright.dev/")
+            screenshot_writer.capture(page, "home.png")
+    """
+    writer = ScreenshotWriter(jpeg_quality=int(os.getenv("SCREENSHOT_JPEG_QUALITY", "0")) or None)
+    yield writer
+    writer.close()
+
+
+# Outside test-results/, which pytest-playwright empties at the start of every run
+ROUTE_CACHE_DIR = ".route-cache"
+
+
+@pytest.fixture(scope="session")
+def route_cache(request):
+    """On-disk asset cache shared by all workers (see route_cache.py)."""
+    cache = RouteCache(
+        ROUTE_CACHE_DIR,
+        max_bytes=int(os.getenv("ROUTE_CACHE_MAX_MB", "200")) * 1024 * 1024,
+    )
+    yield cache
+    workerinput = getattr(request.config, "workerinput", {})
+    cache.save_stats(workerinput.get("workerid", "main"))
+    cache.evict()
+
+
+@pytest.fixture
+def cached_page(page, route_cache, resource_blocking, resource_profile):
+    """
+    ``page`` with scripts, styles, fonts and images served from the shared cache.
+
+    Requests the test's blocking profile aborts are left to the context's
+    blocking route instead of being served or stored.
+
+    Example:
+        def test_home(cached_page):
+            cached_page.goto("https://playwright.dev/")
+    """
+    def handle(route):
+        if resource_blocking.blocks(resource_profile, route.request, page.url):
+            route.fallback()
+        else:
+            route_cache.handle(route)
+
+    page.route("**/*", handle)
+    return page
+
+
+@pytest.fixture(scope="session")
+def auth_login():
+    """
+    Sign-in flow for tests marked ``@pytest.mark.auth("identity")``.
+
+    Override in your own conftest.py:
+
+        @pytest.fixture(scope="session")
+        def auth_login():
+            def login(page, identity):
+                page.goto("https://example.com/login")
+                page.fill("#user", identity)
+                ...
+            return login
+    """
+    def login(page, identity):
+        pytest.fail("Tests marked @pytest.mark.auth need an auth_login fixture that signs in.")
+    return login
+
+
+@pytest.fixture(scope="session")
+def storage_state_cache(auth_login):
+    """Signed-in storage state per identity, shared by all workers."""
+    auth_cookies = [name.strip() for name in os.getenv("STORAGE_STATE_AUTH_COOKIES", "").split(",") if name.strip()]
+    return StorageStateCache(
+        auth_login, ttl=int(os.getenv("STORAGE_STATE_TTL_MINUTES", "30")) * 60, auth_cookies=auth_cookies,
+    )
+
+
+def _auth_identity(request):
+    marker = request.node.get_closest_marker("auth")
+    if marker is None:
         return None
+    return marker.args[0] if marker.args else "default"
+
+
+@pytest.fixture
+def browser_context_args(browser_context_args, browser, request, storage_state_cache):
+    """Start contexts of ``auth``-marked tests already signed in."""
+    identity = _auth_identity(request)
+    if identity is None:
+        return browser_context_args
+    return {**browser_context_args, "storage_state": storage_state_cache.get(identity, browser)}
+
+
+@pytest.fixture(scope="session")
+def resource_blocking(request):
+    """Blocking profiles and the savings baseline (see resource_blocker.py)."""
+    blocking = ResourceBlocking(RESOURCE_BASELINE_FILE, learn=request.config.getoption("--block-resources") == "off")
+    yield blocking
+    blocking.save()
+
+
+@pytest.fixture
+def resource_profile(request):
+    """
+    Blocking profile of the test's context: its ``block_resources`` marker, else ``--block-resources``.
+
+    Example:
+        @pytest.mark.block_resources("structure-only")
+        def test_footer(page):
+            page.goto("https://playwright.dev/")
+            expect(page.locator("footer")).to_be_visible()
+    """
+    marker = request.node.get_closest_marker("block_resources")
+    if marker is not None:
+        return marker.args[0] if marker.args else "structure-only"
+    return request.config.getoption("--block-resources")
+
+
+def _report_resource_savings(request, saved):
+    """Attach what blocking saved to the test's report, for the summary and JUnit XML."""
+    if saved["blocked"]:
+        request.node.user_properties.append(("resource_blocking", dict(saved)))
+
+
+@pytest.fixture
+def context(context, request, storage_state_cache, resource_blocking, resource_profile):
+    """Apply the test's blocking profile; drop a cached sign-in as soon as the app (not a third party) rejects it with 401."""
+    saved = resource_blocking.attach(context, resource_profile)
+    identity = _auth_identity(request)
+    if identity is not None:
+        def on_response(response):
+            if rejects_sign_in(response):
+                storage_state_cache.invalidate(identity)
+        context.on("response", on_response)
+    yield context
+    _report_resource_savings(request, saved)
+
+
+@pytest.fixture(scope="session")
+def _smoke_pages(browser, resource_blocking):
+    """One context per worker, blocking profile and context options, holding a loaded page per smoke URL."""
+    contexts = {}
+
+    def get(profile, context_args):
+        # Tests with different viewport, locale, base URL or sign-in get their own context
+        key = (profile, json.dumps(context_args, sort_keys=True, default=str))
+        if key not in contexts:
+            context = browser.new_context(**context_args)
+            contexts[key] = (context, {}, resource_blocking.attach(context, profile))
+        return contexts[key]
+
+    yield get
+    for context, _, _ in contexts.values():
+        context.close()
+
+
+@pytest.fixture
+def smoke_url():
+    """URL loaded once for ``smoke_page`` tests; override in a test module to change it."""
+    return "https://playwright.dev/"
+
+
+@pytest.fixture
+def smoke_page(request, _smoke_pages, smoke_url, resource_profile, browser_context_args):
+    """
+    Already-loaded page shared by read-only tests marked ``@pytest.mark.smoke``.
+
+    Each test still passes or fails on its own, but the whole batch uses a
+    single remote context and a single navigation instead of one per test.
+    The context is built from ``browser_context_args`` (viewport, locale,
+    base URL, cached sign-in), but it outlives the test, so pytest-playwright's
+    ``--tracing``, ``--video`` and ``--screenshot`` artifacts are not recorded
+    for smoke pages; use ``page`` in a test that needs them.
+
+    Example:
+        @pytest.mark.smoke
+        def test_footer_is_present(smoke_page: Page):
+            expect(smoke_page.locator("footer")).to_be_visible()
+    """
+    if request.node.get_closest_marker("smoke") is None:
+        pytest.fail("smoke_page is shared between tests; use it only in read-only tests marked @pytest.mark.smoke")
+
+    context, pages, saved = _smoke_pages(resource_profile, browser_context_args)
+    before = dict(saved)
+    if smoke_url not in pages or pages[smoke_url][0].is_closed():
+        page = context.new_page()
+        page.goto(smoke_url)
+        pages[smoke_url] = (page, page.url)
+    page, loaded_url = pages[smoke_url]
+    yield page
+    # Only the test that loaded the page saved anything
+    _report_resource_savings(request, {
+        name: value - before[name] if isinstance(value, (int, float)) else value for name, value in saved.items()
+    })
+
+    # A test that navigated away must not leak into the rest of the batch
+    if page.url != loaded_url:
+        page.close()
+        del pages[smoke_url]
+
+
+@pytest.fixture(autouse=True)
+def _profile_round_trips(request):
+    """Attribute the test's protocol calls to it when --profile-round-trips is on."""
+    if not round_trips.enabled or "browser" not in request.fixturenames:
+        yield
+        return
+    round_trips.attach(request.getfixturevalue("browser"))
+    with round_trips.test(_GROUP_SUFFIX.sub("", request.node.nodeid)):
+        yield
+
+
+# Read by later runs; everything else in test-results/ is this run's artifacts
+PERSISTENT_RESULTS = {
+    "durations.json", "worker-stats.json", "results-index.json", "resource-baseline.json", "cold-start.json",
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def delete_output_dir(pytestconfig):
+    """Override pytest-playwright's fixture: clear the last run's artifacts but keep PERSISTENT_RESULTS."""
+    output_dir = pytestconfig.getoption("--output")
+    if not os.path.isdir(output_dir):
+        return
+    for entry in os.listdir(output_dir):
+        if entry in PERSISTENT_RESULTS:
+            continue
+        path = os.path.join(output_dir, entry)
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except (FileNotFoundError, PermissionError):
+            pass  # another xdist worker got there first
 
 
 def pytest_configure(config):
-    """Create test results directory."""
+    """Create test results directory and resolve the service connect options."""
     os.makedirs("test-results", exist_ok=True)
-    os.makedirs("test-results/screenshots", exist_ok=True)
\ No newline at end of file
+    os.makedirs("test-results/screenshots", exist_ok=True)
+
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None and _WORKERINPUT_KEY in workerinput:
+        # xdist worker: reuse what the controller computed
+        config.stash[_CONNECT_OPTIONS_KEY] = workerinput[_WORKERINPUT_KEY]
+    else:
+        config.stash[_CONNECT_OPTIONS_KEY] = _build_connect_options()
+
+    round_trips.enabled = bool(config.getoption("--profile-round-trips") or config.getoption("--profile-file"))
+
+    # pytest.ini's [tool:pytest] section is not read, so markers are registered here
+    config.addinivalue_line("markers", "auth(identity): start signed in as the given identity (see the auth_login fixture)")
+    config.addinivalue_line("markers", "smoke: read-only check that may share one loaded page (see the smoke_page fixture)")
+    config.addinivalue_line(
+        "markers",
+        "block_resources(profile): block requests by profile: structure-only, no-media or no-third-party "
+        "(see resource_blocker.py)",
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """xdist controller: hand the shared connect options to each worker."""
+    node.workerinput[_WORKERINPUT_KEY] = node.config.stash[_CONNECT_OPTIONS_KEY]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Measure CPU time spent in the test body, next to its wall time."""
+    start = time.process_time()
+    yield
+    item.user_properties.append(("cpu_seconds", time.process_time() - start))
+
+
+def pytest_runtest_logreport(report):
+    """Collect per-test latency and throttling signals (on the xdist controller)."""
+    # Connection failures usually surface while the browser fixture is set up
+    if report.failed and any(marker in report.longreprtext for marker in _THROTTLE_MARKERS):
+        _worker_stats["throttled"] += 1
+    nodeid = _GROUP_SUFFIX.sub("", report.nodeid)
+    _run_durations[nodeid] = _run_durations.get(nodeid, 0.0) + report.duration
+    _record_result(nodeid, report)
+    saved = dict(report.user_properties).get("resource_blocking")
+    if saved and report.when == "teardown":
+        _resource_savings[nodeid] = saved
+    if report.when == "call":
+        _worker_stats["tests"] += 1
+        _worker_stats["wall_seconds"] += report.duration
+        _worker_stats["cpu_seconds"] += dict(report.user_properties).get("cpu_seconds", 0.0)
+
+
+def pytest_sessionfinish(session):
+    """Save this run's observations for run_tests.py."""
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None and _index_selection:
+        # Sent to the controller, which has no collected items of its own
+        workeroutput["index_selection"] = dict(_index_selection)
+    if round_trips.calls:
+        workerinput = getattr(session.config, "workerinput", {})
+        _save_round_trips(workerinput.get("workerid", "main"))
+    if hasattr(session.config, "workerinput") or not _worker_stats["tests"]:
+        return
+    durations = {**_load_durations(), **_run_durations}
+    with open(DURATIONS_FILE, "w") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+    results = {**_load_results_index(), **_run_results}
+    with open(RESULTS_INDEX_FILE, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    numprocesses = getattr(session.config.option, "numprocesses", None)
+    workers = numprocesses if isinstance(numprocesses, int) and numprocesses > 0 else 1
+    with open(WORKER_STATS_FILE, "w") as f:
+        json.dump({**_worker_stats, "workers": workers}, f, indent=2)
+
+
+def _load_durations() -> dict:
+    try:
+        with open(DURATIONS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_round_trips(name):
+    """Write this process's protocol calls so the controller can report them."""
+    os.makedirs(ROUND_TRIPS_DIR, exist_ok=True)
+    with open(os.path.join(ROUND_TRIPS_DIR, f"calls-{name}.json"), "w") as f:
+        json.dump(round_trips.calls, f)
+
+
+def _collect_round_trips() -> RoundTripProfiler:
+    """Merge and remove the protocol calls written by every worker."""
+    profile = RoundTripProfiler()
+    if not os.path.isdir(ROUND_TRIPS_DIR):
+        return profile
+    for name in os.listdir(ROUND_TRIPS_DIR):
+        if name.startswith("calls-") and name.endswith(".json"):
+            path = os.path.join(ROUND_TRIPS_DIR, name)
+            try:
+                with open(path) as f:
+                    profile.calls.extend(json.load(f))
+                os.remove(path)
+            except (OSError, ValueError):
+                pass
+    return profile
+
+
+def _load_results_index() -> dict:
+    try:
+        with open(RESULTS_INDEX_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _record_result(nodeid, report):
+    """Fold one setup/call/teardown report into this run's entry for the test."""
+    entry = _run_results.setdefault(nodeid, {"outcome": "passed", "duration": 0.0})
+    entry["duration"] = round(entry["duration"] + report.duration, 3)
+    entry["last_run"] = round(time.time())
+    source_hash = dict(report.user_properties).get("source_hash")
+    if source_hash:
+        entry["hash"] = source_hash
+    if report.failed:
+        entry["outcome"] = "failed"
+    elif report.skipped and entry["outcome"] != "failed":
+        entry["outcome"] = "skipped"
+
+
+def _source(obj) -> str:
+    key = id(obj)
+    if key not in _source_cache:
+        try:
+            _source_cache[key] = inspect.getsource(obj)
+        except (OSError, TypeError):
+            _source_cache[key] = ""
+    return _source_cache[key]
+
+
+def _source_hash(item) -> str:
+    """Hash of the test function and every fixture function it depends on."""
+    parts = [_source(getattr(item, "obj", None))]
+    fixture_defs = getattr(item, "_fixtureinfo", None)
+    name2fixturedefs = fixture_defs.name2fixturedefs if fixture_defs is not None else {}
+    for name in sorted(getattr(item, "fixturenames", ())):
+        for fixturedef in name2fixturedefs.get(name, ()):
+            parts.append(f"{name}:{fixturedef.baseid}:{_source(fixturedef.func)}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def _select_from_index(config, items, estimate):
+    """Order or narrow the tests by what the result index says changed since the last run."""
+    failed_first = config.getoption("--index-failed-first")
+    only_changed = config.getoption("--index-only-changed")
+    budget = config.getoption("--index-budget")
+    index = _load_results_index()
+
+    # 3 = failed last time, 2 = new or changed, 1 = unchanged and passing
+    def priority(item):
+        entry = index.get(item.nodeid)
+        if entry is not None and entry.get("outcome") == "failed":
+            return 3
+        if entry is None or entry.get("hash") != item.stash[_SOURCE_HASH_KEY]:
+            return 2
+        return 1
+
+    # Within a priority, tests that haven't run for longest come first
+    def value(item):
+        return (-priority(item), index.get(item.nodeid, {}).get("last_run", 0), item.nodeid)
+
+    ranked = sorted(items, key=value)
+    if only_changed:
+        ranked = [item for item in ranked if priority(item) > 1]
+    if budget:
+        # The budget is wall time, so N workers fit N times as much test time
+        numprocesses = getattr(config.option, "numprocesses", None)
+        workers = numprocesses if isinstance(numprocesses, int) and numprocesses > 0 else 1
+        remaining = budget * workers
+        fitting = []
+        for item in ranked:
+            if estimate(item) <= remaining:
+                fitting.append(item)
+                remaining -= estimate(item)
+        ranked = fitting
+    if not failed_first:
+        # Narrowed, but in collection order
+        selected = set(ranked)
+        ranked = [item for item in items if item in selected]
+
+    selected = set(ranked)
+    deselected = [item for item in items if item not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = ranked
+    _index_selection.update(
+        selected=len(items),
+        collected=len(items) + len(deselected),
+        failed=sum(1 for item in items if priority(item) == 3),
+        changed=sum(1 for item in items if priority(item) == 2),
+        predicted_seconds=round(sum(estimate(item) for item in items), 1),
+    )
+
+
+def _balance(items, estimate, bins):
+    """Longest-processing-time-first: give each test to the least loaded bin."""
+    buckets = [[] for _ in range(bins)]
+    loads = [0.0] * bins
+    for item in sorted(items, key=lambda item: (-estimate(item), item.nodeid)):
+        index = loads.index(min(loads))
+        buckets[index].append(item)
+        loads[index] += estimate(item)
+    return buckets, loads
+
+
+def pytest_collection_modifyitems(config, items):
+    """Select tests from the result index and this machine's shard, and pre-assign tests to workers by duration."""
+    for item in items:
+        # Reported with every test so the controller can record it in the result index
+        item.stash[_SOURCE_HASH_KEY] = _source_hash(item)
+        item.user_properties.append(("source_hash", item.stash[_SOURCE_HASH_KEY]))
+
+    shard = config.getoption("--shard")
+    workers = config.getoption("--balance-workers")
+    use_index = (config.getoption("--index-failed-first") or config.getoption("--index-only-changed")
+                 or config.getoption("--index-budget"))
+    if not shard and not workers and not use_index:
+        return
+
+    durations = _load_durations()
+    # Tests never seen before are assumed to take a typical amount of time
+    default = statistics.median(durations.values()) if durations else 1.0
+    estimate = lambda item: durations.get(item.nodeid, default)
+
+    if use_index:
+        _select_from_index(config, items, estimate)
+
+    if shard:
+        try:
+            index, count = (int(part) for part in shard.split("/"))
+            if not 1 <= index <= count:
+                raise ValueError
+        except ValueError:
+            raise pytest.UsageError(f"--shard must look like I/N with 1 <= I <= N, got: {shard}")
+        # Every machine computes the same partition from the same durations file
+        buckets, loads = _balance(items, estimate, count)
+        selected = set(buckets[index - 1])
+        config.hook.pytest_deselected(items=[item for item in items if item not in selected])
+        items[:] = [item for item in items if item in selected]
+        if not hasattr(config, "workerinput"):
+            print(f"🧩 Shard {index}/{count}: {len(items)} tests, ~{loads[index - 1]:.1f}s predicted")
+
+    if workers > 1:
+        # Runs on each xdist worker; all of them compute the same assignment
+        buckets, _ = _balance(items, estimate, workers)
+        for index, bucket in enumerate(buckets):
+            for item in bucket:
+                item.add_marker(pytest.mark.xdist_group(f"balance{index}"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """xdist controller: keep the result index selection a worker reports (all compute the same one)."""
+    _index_selection.update(getattr(node, "workeroutput", {}).get("index_selection", {}))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report the result index selection, route cache hit rate and round trips across all workers."""
+    if hasattr(config, "workerinput"):
+        return
+    if _index_selection:
+        terminalreporter.write_line(
+            f"🎯 Result index: {_index_selection['selected']}/{_index_selection['collected']} tests selected "
+            f"({_index_selection['failed']} failed, {_index_selection['changed']} new or changed), "
+            f"~{_index_selection['predicted_seconds']:.1f}s predicted"
+        )
+    if round_trips.enabled:
+        profile = _collect_round_trips()
+        if profile.calls:
+            for line in profile.report_lines(top_tests=10):
+                terminalreporter.write_line(line)
+            profile_file = config.getoption("--profile-file")
+            if profile_file:
+                profile.write_folded(profile_file)
+                terminalreporter.write_line(f"📝 Folded stacks written to {profile_file}")
+    if _resource_savings:
+        totals = {"blocked": 0, "bytes_saved": 0, "unknown_size": 0, "seconds_saved": 0.0}
+        for saved in _resource_savings.values():
+            for name in totals:
+                totals[name] += saved[name]
+        terminalreporter.write_line(f"🚫 Resource blocking in {len(_resource_savings)} tests: {resource_blocker.describe(totals)}")
+        heaviest = sorted(_resource_savings.items(), key=lambda item: -item[1]["bytes_saved"])[:5]
+        for nodeid, saved in heaviest:
+            terminalreporter.write_line(f"   {nodeid} [{saved['profile']}]: {resource_blocker.describe(saved)}")
+    stats = RouteCache.collect_stats(ROUTE_CACHE_DIR)
+    cacheable = stats.get("hits", 0) + stats.get("revalidated", 0) + stats.get("misses", 0)
+    if cacheable:
+        served = stats["hits"] + stats["revalidated"]
+        terminalreporter.write_line(
+            f"🗄️  Route cache: {served}/{cacheable} assets served from cache ({served / cacheable:.0%}), "
+            f"{stats['revalidated']} revalidated, {stats['bytes_served'] / 1024 / 1024:.1f} MB served locally"
+        )
@@ -0,0 +1,227 @@
+"""
+Resource blocking profiles for tests that only check page structure.
+
+A test that asserts on ``nav``, ``footer`` or a heading still makes the remote
+browser download every image, font, video and analytics script of the page,
+and ``page.goto()`` waits for all of them before the ``load`` event.
+ResourceBlocking routes a BrowserContext so that a profile's requests are
+aborted inside the remote browser instead:
+
+- ``no-media``: images, video/audio and fonts
+- ``no-third-party``: requests to any site other than the page's own
+- ``structure-only``: both, plus stylesheets
+
+Profiles that only block by type intercept just URLs with matching file
+extensions, so every other request is handled inside the remote browser
+without a round trip to the test; ``no-third-party`` and ``structure-only``
+have to see every request.
+
+Savings are estimated from a baseline recorded by a run with blocking off
+(``learn=True``): the size of each URL and the time from navigation to the
+``load`` event of each page. Blocked URLs the baseline doesn't know are
+counted at the median size of their resource type.
+"""
+import json
+import os
+import re
+import statistics
+import time
+import uuid
+from urllib.parse import urlsplit
+
+# Resource types each profile aborts, and whether it aborts other sites too
+PROFILES = {
+    "no-media": {"resource_types": {"image", "media", "font"}, "third_party": False},
+    "no-third-party": {"resource_types": set(), "third_party": True},
+    "structure-only": {"resource_types": {"image", "media", "font", "stylesheet"}, "third_party": True},
+}
+
+# URLs that look like each resource type, intercepted by type-only profiles
+_EXTENSIONS = {
+    "image": "png|jpe?g|gif|webp|avif|svg|ico|bmp",
+    "media": "mp4|webm|ogg|ogv|mp3|wav|m4a|mov",
+    "font": "woff2?|ttf|otf|eot",
+    "stylesheet": "css",
+}
+
+
+def _site(url):
+    """Last two labels of the host; good enough to tell a page's own requests from third parties."""
+    host = urlsplit(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+
+def _is_main_document(request):
+    try:
+        return request.is_navigation_request() and request.frame.parent_frame is None
+    except Exception:
+        return False  # service worker requests have no frame
+
+
+def route_pattern(profile):
+    """What the context intercepts for ``profile``: everything, or only matching extensions."""
+    spec = PROFILES[profile]
+    if spec["third_party"]:
+        return "**/*"
+    extensions = "|".join(_EXTENSIONS[resource_type] for resource_type in sorted(spec["resource_types"]))
+    return re.compile(rf"\.({extensions})([?#]|$)", re.IGNORECASE)
+
+
+def describe(saved):
+    """One-line summary of a stats dict."""
+    text = f"{saved['blocked']} requests blocked, ~{saved['bytes_saved'] / 1024 / 1024:.1f} MB"
+    if saved["unknown_size"]:
+        text += f" (+{saved['unknown_size']} of unknown size)"
+    return text + f", ~{saved['seconds_saved']:.1f}s of page load saved"
+
+
+class ResourceBlocking:
+    """
+    Applies blocking profiles to BrowserContexts and estimates what they save.
+
+    Args:
+        path: Baseline of URL sizes and page load times, shared by runs
+        learn: Ignore profiles and record the baseline instead
+    """
+
+    def __init__(self, path=os.path.join("test-results", "resource-baseline.json"), learn=False):
+        self.path = path
+        self.learn = learn
+        self.stats = self._new_stats(None)
+        self._baseline = self._load()
+        self._type_medians = {}
+        self._dirty = False
+
+    def attach(self, context, profile=None):
+        """
+        Block ``profile``'s requests in ``context`` (None blocks nothing).
+
+        Returns the context's own counters, updated as it loads pages.
+        """
+        stats = self._new_stats(profile)
+        if self.learn:
+            self._learn(context)
+            return stats
+        if profile is None:
+            return stats
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown resource blocking profile {profile!r}, expected one of: {', '.join(PROFILES)}")
+
+        spec = PROFILES[profile]
+        sites = set()
+
+        def handle(route):
+            request = route.request
+            if _is_main_document(request):
+                sites.add(_site(request.url))
+                route.fallback()
+                return
+            third_party = spec["third_party"] and sites and _site(request.url) not in sites
+            if request.resource_type in spec["resource_types"] or third_party:
+                self._count_blocked(stats, request)
+                route.abort("blockedbyclient")
+            else:
+                route.fallback()
+
+        context.route(route_pattern(profile), handle)
+        self._watch_loads(context, lambda url, seconds: self._count_load(stats, url, seconds))
+        return stats
+
+    def blocks(self, profile, request, page_url):
+        """
+        Whether ``profile`` aborts ``request`` of the page at ``page_url``.
+
+        For page routes, which run before the context's blocking route and
+        must not answer requests the profile is meant to abort.
+        """
+        spec = PROFILES.get(profile)
+        if self.learn or spec is None:
+            return False
+        if request.resource_type in spec["resource_types"]:
+            return True
+        return spec["third_party"] and _site(request.url) != _site(page_url)
+
+    def save(self):
+        """Merge what this process learned into the baseline file."""
+        if not self._dirty:
+            return
+        # Other xdist workers may have saved since we loaded
+        baseline = self._load()
+        for table in ("sizes", "load_seconds"):
+            baseline[table].update(self._baseline[table])
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(baseline, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    @staticmethod
+    def _new_stats(profile):
+        return {"profile": profile, "blocked": 0, "bytes_saved": 0, "unknown_size": 0, "seconds_saved": 0.0}
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            baseline = {}
+        return {"sizes": baseline.get("sizes", {}), "load_seconds": baseline.get("load_seconds", {})}
+
+    def _learn(self, context):
+        def on_response(response):
+            length = response.headers.get("content-length")
+            if length and length.isdigit():
+                self._baseline["sizes"][response.url] = [int(length), response.request.resource_type]
+                self._dirty = True
+
+        def on_load(url, seconds):
+            self._baseline["load_seconds"][url] = round(seconds, 3)
+            self._dirty = True
+
+        context.on("response", on_response)
+        self._watch_loads(context, on_load)
+
+    @staticmethod
+    def _watch_loads(context, record):
+        """Call ``record(url, seconds)`` with the time from each main-frame navigation to its load event."""
+        def watch(page):
+            started = {}
+
+            def on_navigated(frame):
+                if frame == page.main_frame:
+                    started["at"] = time.perf_counter()
+
+            def on_load(_):
+                if "at" in started:
+                    record(page.url.split("#")[0], time.perf_counter() - started.pop("at"))
+
+            page.on("framenavigated", on_navigated)
+            page.on("load", on_load)
+
+        for page in context.pages:
+            watch(page)
+        context.on("page", watch)
+
+    def _count_blocked(self, stats, request):
+        known = self._baseline["sizes"].get(request.url)
+        size = known[0] if known else self._type_median(request.resource_type)
+        for counters in (stats, self.stats):
+            counters["blocked"] += 1
+            if size is None:
+                counters["unknown_size"] += 1
+            else:
+                counters["bytes_saved"] += size
+
+    def _count_load(self, stats, url, seconds):
+        baseline = self._baseline["load_seconds"].get(url)
+        if baseline is None:
+            return
+        for counters in (stats, self.stats):
+            counters["seconds_saved"] += baseline - seconds
+
+    def _type_median(self, resource_type):
+        if resource_type not in self._type_medians:
+            sizes = [size for size, kind in self._baseline["sizes"].values() if kind == resource_type]
+            self._type_medians[resource_type] = int(statistics.median(sizes)) if sizes else None
+        return self._type_medians[resource_type]
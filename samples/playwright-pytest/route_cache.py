@@ -0,0 +1,198 @@
+"""
+On-disk cache for static assets requested by remote browsers.
+
+Every test in this suite loads the same pages, so each remote browser downloads
+the same scripts, styles, fonts and images again, on every worker and every run.
+RouteCache is installed with ``page.route()`` and serves those assets from a
+cache directory shared by all xdist workers:
+
+- fresh entries (Cache-Control max-age, or a default TTL) are served without
+  touching the network
+- stale entries with an ETag / Last-Modified are revalidated with a
+  conditional request; on 304 the cached body is served
+- the least recently used entries are evicted when the cache grows past its
+  size cap
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+
+CACHEABLE_RESOURCE_TYPES = ("script", "stylesheet", "font", "image")
+
+# Headers that describe the wire encoding rather than the (decoded) body we store
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class RouteCache:
+    """
+    Route handler backed by a shared on-disk cache, keyed by URL.
+
+    Args:
+        directory: Cache directory (shared by workers and runs); keep it out of
+            pytest-playwright's output directory, which is emptied every run
+        max_bytes: Size cap; least recently used entries are evicted beyond it
+        default_ttl: Seconds an entry without Cache-Control max-age stays fresh
+        resource_types: Request resource types that are cached
+    """
+
+    def __init__(self, directory=".route-cache", max_bytes=200 * 1024 * 1024,
+                 default_ttl=3600, resource_types=CACHEABLE_RESOURCE_TYPES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.resource_types = set(resource_types)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bypassed": 0, "bytes_served": 0}
+        self._stores_since_evict = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def handle(self, route):
+        """page.route() handler."""
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.resource_types:
+            self.stats["bypassed"] += 1
+            route.fallback()
+            return
+
+        key = hashlib.sha256(request.url.encode()).hexdigest()
+        entry = self._load(key)
+        if entry and entry["expires"] > time.time():
+            self._serve(route, key, entry, "hits")
+            return
+
+        headers = dict(request.headers)
+        if entry and entry.get("etag"):
+            headers["if-none-match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["if-modified-since"] = entry["last_modified"]
+        try:
+            response = route.fetch(headers=headers)
+        except Exception:
+            # Network error or the context is closing: let the browser handle the request
+            self.stats["bypassed"] += 1
+            route.fallback()
+            return
+
+        if response.status == 304 and entry:
+            entry["expires"] = self._expires(response.headers)
+            self._write_meta(key, entry)
+            self._serve(route, key, entry, "revalidated")
+            return
+
+        self.stats["misses"] += 1
+        body = response.body()
+        if response.status == 200 and self._cacheable(response.headers):
+            self._store(key, request.url, response, body)
+        route.fulfill(response=response, body=body)
+
+    def save_stats(self, name):
+        """Write this process's counters so the controller can report them."""
+        with open(os.path.join(self.directory, f"stats-{name}.json"), "w") as f:
+            json.dump(self.stats, f)
+
+    @classmethod
+    def collect_stats(cls, directory=".route-cache"):
+        """Sum and remove the counters written by every worker."""
+        totals = {}
+        if not os.path.isdir(directory):
+            return totals
+        for name in os.listdir(directory):
+            if name.startswith("stats-") and name.endswith(".json"):
+                path = os.path.join(directory, name)
+                try:
+                    with open(path) as f:
+                        for counter, value in json.load(f).items():
+                            totals[counter] = totals.get(counter, 0) + value
+                    os.remove(path)
+                except (OSError, ValueError):
+                    pass
+        return totals
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".body"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # evicted by another worker
+                entries.append((stat.st_mtime, stat.st_size, name[:-len(".body")]))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for suffix in (".body", ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, key + suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def _serve(self, route, key, entry, counter):
+        body_path = os.path.join(self.directory, key + ".body")
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+            os.utime(body_path)  # mark as recently used
+        except FileNotFoundError:
+            # Evicted by another worker in the meantime
+            route.fallback()
+            return
+        self.stats[counter] += 1
+        self.stats["bytes_served"] += len(body)
+        route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+
+    def _load(self, key):
+        try:
+            with open(os.path.join(self.directory, key + ".json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, url, response, body):
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in _HOP_HEADERS}
+        entry = {
+            "url": url,
+            "status": response.status,
+            "headers": headers,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "expires": self._expires(response.headers),
+        }
+        # Write-then-rename so other workers never read a partial entry
+        self._atomic_write(key + ".body", body)
+        self._write_meta(key, entry)
+
+        self._stores_since_evict += 1
+        if self._stores_since_evict >= 50:
+            self._stores_since_evict = 0
+            self.evict()
+
+    def _write_meta(self, key, entry):
+        self._atomic_write(key + ".json", json.dumps(entry).encode())
+
+    def _atomic_write(self, name, data):
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _expires(self, headers):
+        cache_control = headers.get("cache-control", "")
+        if "no-cache" in cache_control:
+            return 0  # always revalidate
+        match = _MAX_AGE.search(cache_control)
+        ttl = int(match.group(1)) if match else self.default_ttl
+        return time.time() + ttl
+
+    @staticmethod
+    def _cacheable(headers):
+        cache_control = headers.get("cache-control", "")
+        return "no-store" not in cache_control and "private" not in cache_control and headers.get("vary") != "*"
@@ -6,7 +6,21 @@ Helper script to run Playwright tests with different configurations.
 import subprocess
 import sys
 import argparse
+import glob
+import json
+import math
 import os
+import time
+
+# Written by conftest.py after every run
+WORKER_STATS_FILE = os.path.join("test-results", "worker-stats.json")
+DURATIONS_FILE = os.path.join("test-results", "durations.json")
+# Cold pytest startup per interpreter, measured once by run_tests.py
+COLD_START_FILE = os.path.join("test-results", "cold-start.json")
+
+# Remote tests mostly wait on the network; start this many workers per core
+# until a previous run tells us the real wall/CPU ratio
+DEFAULT_IO_FACTOR = 4
 
 
 def run_command(command, description):
@@ -24,12 +38,134 @@ def run_command(command, description):
         return e.returncode
 
 
+def measure_cold_start(env):
+    """Time a fresh interpreter loading pytest and its plugins (what each shell run pays)."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "pytest", "--version"], env=env, capture_output=True)
+    return time.perf_counter() - start
+
+
+def cold_start_seconds(env):
+    """Cold pytest startup of this interpreter, measured on first use and cached in COLD_START_FILE."""
+    try:
+        with open(COLD_START_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if sys.executable not in cache:
+        cache[sys.executable] = round(measure_cold_start(env), 3)
+        os.makedirs(os.path.dirname(COLD_START_FILE), exist_ok=True)
+        with open(COLD_START_FILE, "w") as f:
+            json.dump(cache, f, indent=2)
+    return cache[sys.executable]
+
+
+def forget_project_modules():
+    """Drop test modules and conftest.py from sys.modules so edits are picked up."""
+    project_dir = os.path.abspath(os.getcwd())
+    for name, module in list(sys.modules.items()):
+        path = os.path.abspath(getattr(module, "__file__", None) or "")
+        # Keep installed packages warm, even from a virtualenv inside the project
+        if name != "__main__" and path.startswith(project_dir + os.sep) and "site-packages" not in path:
+            del sys.modules[name]
+
+
+def watched_files_snapshot():
+    """Modification times of the files a re-run depends on."""
+    paths = glob.glob("tests/**/*.py", recursive=True) + ["conftest.py", "pytest.ini"]
+    return {path: os.path.getmtime(path) for path in paths if os.path.exists(path)}
+
+
+def run_in_process(pytest_args, env, repeat=1, watch=False, report_savings=True):
+    """
+    Run pytest.main() in this interpreter instead of a shell subprocess.
+    
+    pytest, playwright and the other plugins are imported once and stay warm
+    for every repeat or watch re-run; only test modules are re-imported.
+    With ``report_savings``, the cached cold startup time is used to print
+    what the warm re-runs saved.
+    """
+    cold_start = cold_start_seconds(env) if report_savings else None
+    os.environ.clear()
+    os.environ.update(env)
+    import pytest
+
+    print(f"Running in-process: pytest {' '.join(pytest_args)}")
+    runs = 0
+    returncode = 0
+    try:
+        while True:
+            forget_project_modules()
+            start = time.perf_counter()
+            returncode = int(pytest.main(list(pytest_args)))
+            runs += 1
+            print(f"⏱️  Run {runs} finished in {time.perf_counter() - start:.2f}s (exit code {returncode})")
+
+            if watch:
+                print("👀 Watching tests/, conftest.py and pytest.ini for changes (Ctrl+C to stop)...")
+                snapshot = watched_files_snapshot()
+                while watched_files_snapshot() == snapshot:
+                    time.sleep(1)
+            elif runs >= repeat:
+                break
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped watching")
+
+    # The first run imports the plugins too; every later run skips that cost
+    if cold_start is not None:
+        print(f"⚡ Cold pytest startup is {cold_start:.2f}s; {runs} in-process runs saved ~{cold_start * max(runs - 1, 0):.2f}s")
+    return returncode
+
+
+def load_worker_stats():
+    """Return the previous run's observations, or None."""
+    try:
+        with open(WORKER_STATS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def adaptive_workers(max_sessions, stats=None):
+    """
+    Pick an xdist worker count for remote browsers.
+    
+    Remote tests are bound by the workspace's parallel-session quota and
+    network latency, not local cores: a test that spends 10x more wall time
+    than CPU time lets one core drive ~10 workers. The count never exceeds
+    ``max_sessions``, halves after a run that hit throttling or connection
+    errors, and grows back gradually after that.
+    """
+    cpus = os.cpu_count() or 1
+    if not stats:
+        return max(1, min(max_sessions, cpus * DEFAULT_IO_FACTOR))
+
+    io_ratio = stats["wall_seconds"] / max(stats["cpu_seconds"], 1e-3)
+    target = min(max_sessions, math.ceil(cpus * io_ratio))
+    previous = stats.get("workers", target)
+    if stats.get("throttled"):
+        target = min(target, previous // 2)
+    else:
+        target = min(target, previous + max(1, previous // 4))
+    return max(1, target)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Playwright pytest test runner")
     parser.add_argument("--service", action="store_true", help="Run tests using Playwright Service")
     parser.add_argument("--local", action="store_true", help="Run tests using local browsers")
     parser.add_argument("--headed", action="store_true", help="Run in headed mode (local only)")
-    parser.add_argument("--parallel", action="store_true", help="Run tests in parallel")
+    parser.add_argument("--parallel", action="store_true", help="Run tests in parallel (same as --workers auto)")
+    parser.add_argument("--workers", help="Worker count: a number, 'auto' (one per CPU) or 'adaptive' (from workspace quota and observed latency)")
+    parser.add_argument("--max-sessions", type=int, default=int(os.getenv("PLAYWRIGHT_SERVICE_MAX_PARALLEL", "50")),
+                        help="Workspace parallel-session limit used by --workers adaptive (default: PLAYWRIGHT_SERVICE_MAX_PARALLEL or 50)")
+    parser.add_argument("--shard", help="Run only shard I of N (e.g. 2/4), balanced by recorded test durations")
+    parser.add_argument("--failed-first", action="store_true", help="Run tests that failed, changed or are new since the last run first")
+    parser.add_argument("--only-changed", action="store_true", help="Run only tests that failed, changed or are new since the last run")
+    parser.add_argument("--budget", type=float, metavar="SECONDS", help="Run the highest-value tests predicted to finish within SECONDS")
+    parser.add_argument("--in-process", action="store_true", help="Call pytest.main() in this interpreter instead of a subprocess")
+    parser.add_argument("--repeat", type=int, default=1, help="Run the suite N times in-process, reusing imported plugins")
+    parser.add_argument("--watch", action="store_true", help="Re-run in-process whenever tests change")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--install", action="store_true", help="Install dependencies and browsers")
     
@@ -62,16 +198,47 @@ def main():
             env["HEADLESS"] = "false"
             print("👁️  Running in headed mode")
     
-    # Build pytest command
-    cmd_parts = ["python", "-m", "pytest"]
+    # Build pytest arguments
+    pytest_args = []
     
     if args.verbose:
-        cmd_parts.append("-v")
+        pytest_args.append("-v")
+    
+    workers = args.workers or ("auto" if args.parallel else None)
+    if workers == "adaptive":
+        if env.get("PLAYWRIGHT_SERVICE_URL"):
+            stats = load_worker_stats()
+            workers = str(adaptive_workers(args.max_sessions, stats))
+            basis = "previous run" if stats else "defaults"
+            print(f"⚙️  Adaptive workers: {workers} (limit {args.max_sessions}, based on {basis})")
+        else:
+            # Local browsers are CPU-bound
+            workers = "auto"
+    if workers == "auto" and os.path.exists(DURATIONS_FILE):
+        # A concrete count is needed to pre-assign tests to workers
+        workers = str(os.cpu_count() or 1)
+    if workers:
+        pytest_args.extend(["-n", workers])
+        if workers.isdigit() and int(workers) > 1 and os.path.exists(DURATIONS_FILE):
+            # Longest-first pre-assignment instead of xdist's default distribution
+            pytest_args.extend(["--dist", "loadgroup", "--balance-workers", workers])
+    
+    if args.shard:
+        pytest_args.extend(["--shard", args.shard])
+    
+    # Selection from test-results/results-index.json, written by conftest.py
+    if args.failed_first:
+        pytest_args.append("--index-failed-first")
+    if args.only_changed:
+        pytest_args.append("--index-only-changed")
+    if args.budget:
+        pytest_args.extend(["--index-budget", str(args.budget)])
     
-    if args.parallel:
-        cmd_parts.extend(["-n", "auto"])
+    if args.in_process or args.repeat > 1 or args.watch:
+        # xdist workers pay the cold start anyway, so only plain runs report savings
+        return run_in_process(pytest_args, env, repeat=args.repeat, watch=args.watch, report_savings=not workers)
     
-    command = " ".join(cmd_parts)
+    command = " ".join(["python", "-m", "pytest"] + pytest_args)
     
     # Run the command with environment variables
     result = subprocess.run(command, shell=True, env=env)
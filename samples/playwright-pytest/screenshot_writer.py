@@ -0,0 +1,81 @@
+"""
+Background screenshot writer shared by the tests of one worker.
+
+Encoding and writing screenshots to disk in the test adds to every test's
+wall time. ScreenshotWriter hands the bytes to writer threads instead, keeps
+at most a memory budget of them queued, and writes identical images once.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ScreenshotWriter:
+    """
+    Write screenshots on background threads instead of in the test.
+
+    At most ``max_pending_bytes`` of screenshots wait in memory; ``write()``
+    blocks when the budget is used up. Identical images (same SHA-256) are
+    written once and the first path is returned for later duplicates; an
+    image still queued is written again, so a failed write never leaves
+    duplicates pointing at a missing file.
+    """
+
+    def __init__(self, directory="test-results/screenshots", max_pending_bytes=64 * 1024 * 1024, jpeg_quality=None):
+        self.directory = directory
+        self.max_pending_bytes = max_pending_bytes
+        self.jpeg_quality = jpeg_quality
+        self.stats = {"written": 0, "deduplicated": 0, "bytes_written": 0}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshot-writer")
+        self._futures = []
+        self._by_digest = {}
+        self._pending_bytes = 0
+        self._space = threading.Condition()
+
+    def capture(self, page, name: str, full_page: bool = False) -> str:
+        """Take a screenshot at CSS pixel scale (JPEG if jpeg_quality is set) and queue it."""
+        options = {"full_page": full_page, "scale": "css"}
+        if self.jpeg_quality is not None:
+            options.update(type="jpeg", quality=self.jpeg_quality)
+            name = os.path.splitext(name)[0] + ".jpg"
+        return self.write(name, page.screenshot(**options))
+
+    def write(self, name: str, data: bytes) -> str:
+        """Queue ``data`` to be written as ``name`` and return its path."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._space:
+            if digest in self._by_digest:
+                self.stats["deduplicated"] += 1
+                return self._by_digest[digest]
+            path = os.path.join(self.directory, name)
+            # A single oversized screenshot is still allowed once the queue drains
+            self._space.wait_for(
+                lambda: not self._pending_bytes or self._pending_bytes + len(data) <= self.max_pending_bytes
+            )
+            self._pending_bytes += len(data)
+        self._futures.append(self._executor.submit(self._write_file, path, data, digest))
+        return path
+
+    def close(self):
+        """Wait for queued screenshots and surface any write error."""
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+
+    def _write_file(self, path, data, digest):
+        written = False
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            written = True
+        finally:
+            with self._space:
+                self._pending_bytes -= len(data)
+                if written:
+                    # Only images that are on disk can be deduplicated against
+                    self._by_digest.setdefault(digest, path)
+                    self.stats["written"] += 1
+                    self.stats["bytes_written"] += len(data)
+                self._space.notify_all()
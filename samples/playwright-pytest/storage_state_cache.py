@@ -0,0 +1,140 @@
+"""
+Signed-in storage state shared by all tests and xdist workers.
+
+Replaying a sign-in flow on a remote browser for every test is usually the
+slowest step of a suite. StorageStateCache runs the login once per identity,
+saves the context's ``storage_state`` to ``.auth/<identity>.json``
+and hands that file to every later context. A lock file makes sure parallel
+workers log in only once between them.
+
+Entries expire after ``ttl`` seconds or, when ``auth_cookies`` names the
+cookies that carry the sign-in, when the first of those expires, whichever
+comes first. They are invalidated when the app itself answers 401 (see
+``rejects_sign_in()``).
+"""
+import json
+import os
+import re
+import time
+import uuid
+from urllib.parse import urlsplit
+
+
+class _FileLock:
+    """Cross-process lock held by exclusively creating a lock file."""
+
+    def __init__(self, path, stale_after=120.0):
+        self.path = path
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    # A worker that crashed mid-login must not block everyone forever
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.2)
+
+    def __exit__(self, *exc_info):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class StorageStateCache:
+    """
+    Per-identity storage state files.
+
+    Args:
+        login: ``login(page, identity)`` that signs in on ``page``
+        directory: Where state files are kept; outside pytest-playwright's
+            output directory, which is emptied every run
+        ttl: Seconds a state file is reused before logging in again
+        auth_cookies: Names of the sign-in cookies; a state file also expires
+            with the first of them (default: only ``ttl`` counts)
+    """
+
+    def __init__(self, login, directory=".auth", ttl=30 * 60, auth_cookies=()):
+        self.login = login
+        self.directory = directory
+        self.ttl = ttl
+        self.auth_cookies = set(auth_cookies)
+        self.stats = {"reused": 0, "logins": 0, "invalidated": 0}
+
+    def get(self, identity, browser):
+        """Return a valid storage state file for ``identity``, logging in if needed."""
+        path = self._path(identity)
+        if self._is_fresh(path):
+            self.stats["reused"] += 1
+            return path
+
+        os.makedirs(self.directory, exist_ok=True)
+        with _FileLock(path + ".lock"):
+            # Another worker may have logged in while we waited for the lock
+            if self._is_fresh(path):
+                self.stats["reused"] += 1
+                return path
+            context = browser.new_context()
+            try:
+                self.login(context.new_page(), identity)
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                context.storage_state(path=tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                context.close()
+            self.stats["logins"] += 1
+            return path
+
+    def invalidate(self, identity):
+        """Forget the state of ``identity``, e.g. after a 401 response."""
+        try:
+            os.remove(self._path(identity))
+            self.stats["invalidated"] += 1
+        except FileNotFoundError:
+            pass
+
+    def _path(self, identity):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", identity) + ".json")
+
+    def _is_fresh(self, path):
+        try:
+            expires = os.path.getmtime(path) + self.ttl
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        # Only the sign-in cookies count: an analytics or consent cookie expiring
+        # soon must not force a new login. Session cookies have expires == -1.
+        cookie_expiry = [
+            cookie["expires"] for cookie in state.get("cookies", [])
+            if cookie["name"] in self.auth_cookies and cookie.get("expires", -1) > 0
+        ]
+        if cookie_expiry:
+            expires = min(expires, min(cookie_expiry))
+        return time.time() < expires
+
+
+def rejects_sign_in(response):
+    """Whether ``response`` is a 401 from the app itself rather than from a third-party request."""
+    if response.status != 401:
+        return False
+    try:
+        frame = response.frame
+    except Exception:
+        return False  # service worker requests have no frame
+    if response.request.is_navigation_request() and frame.parent_frame is None:
+        return True
+    return _origin(response.url) == _origin(frame.page.url)
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return parts.scheme, parts.netloc
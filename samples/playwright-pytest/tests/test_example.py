@@ -1,11 +1,16 @@
 import re
+import pytest
 from playwright.sync_api import Page, expect, Browser
 
-def test_has_title(page: Page):
-    page.goto("https://playwright.dev/")
+# Read-only checks marked "smoke" share one loaded page (see smoke_page in conftest.py)
+
+# These tests only check structure and links: skip downloading images, video and fonts
+pytestmark = pytest.mark.block_resources("no-media")
 
+@pytest.mark.smoke
+def test_has_title(smoke_page: Page):
     # Expect a title "to contain" a substring.
-    expect(page).to_have_title(re.compile("Playwright"))
+    expect(smoke_page).to_have_title(re.compile("Playwright"))
 
 def test_get_started_link(page: Page):
     page.goto("https://playwright.dev/")
@@ -16,41 +21,35 @@ def test_get_started_link(page: Page):
     # Expects page to have a heading with the name of Installation.
     expect(page.get_by_role("heading", name="Installation")).to_be_visible()
 
-def test_page_loads_successfully(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_page_loads_successfully(smoke_page: Page):
     # Verify page loads and has expected title
-    expect(page).to_have_title(re.compile("Playwright"))
+    expect(smoke_page).to_have_title(re.compile("Playwright"))
 
-def test_navigation_menu_visible(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_navigation_menu_visible(smoke_page: Page):
     # Check if navigation menu is visible
-    expect(page.locator("nav")).to_be_visible()
+    expect(smoke_page.locator("nav")).to_be_visible()
 
-def test_documentation_link_exists(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_documentation_link_exists(smoke_page: Page):
     # Verify documentation link is present
-    expect(page.get_by_role("link", name="Docs")).to_be_visible()
+    expect(smoke_page.get_by_role("link", name="Docs")).to_be_visible()
 
-def test_hero_section_content(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_hero_section_content(smoke_page: Page):
     # Check for main heading or hero content
-    expect(page.locator("h1")).to_be_visible()
+    expect(smoke_page.locator("h1")).to_be_visible()
 
-def test_footer_is_present(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_footer_is_present(smoke_page: Page):
     # Verify footer exists on the page
-    expect(page.locator("footer")).to_be_visible()
+    expect(smoke_page.locator("footer")).to_be_visible()
 
-def test_search_functionality_available(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_search_functionality_available(smoke_page: Page):
     # Verify footer exists on the page
-    expect(page.locator("footer")).to_be_visible()
+    expect(smoke_page.locator("footer")).to_be_visible()
 
 def test_api_link_navigation(page: Page):
     page.goto("https://playwright.dev/")
@@ -62,9 +61,8 @@ def test_api_link_navigation(page: Page):
         # Verify navigation occurred
         expect(page).to_have_url(re.compile(".*api.*"))
 
-def test_community_section_exists(page: Page):
-    page.goto("https://playwright.dev/")
-    
+@pytest.mark.smoke
+def test_community_section_exists(smoke_page: Page):
     # Look for community or social links
-    community_links = page.locator('a[href*="github"], a[href*="discord"], a[href*="twitter"]')
+    community_links = smoke_page.locator('a[href*="github"], a[href*="discord"], a[href*="twitter"]')
     expect(community_links.first).to_be_visible()
\ No newline at end of file
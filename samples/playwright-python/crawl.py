@@ -0,0 +1,26 @@
+import sys
+
+from playwright_service import RemoteBrowserPool
+
+
+def page_title(context, url):
+    page = context.new_page()
+    page.goto(url)
+    return page.title()
+
+
+# URLs from a file (one per line), or the Playwright docs by default
+urls = [line.strip() for line in open(sys.argv[1]) if line.strip()] if len(sys.argv) > 1 else [
+    "https://playwright.dev",
+    "https://playwright.dev/python/docs/intro",
+    "https://playwright.dev/python/docs/api/class-playwright",
+]
+
+with RemoteBrowserPool(size=4) as pool:
+    futures = {url: pool.submit(page_title, url) for url in urls}
+    for url, future in futures.items():
+        try:
+            print(f"{url}: {future.result()}")
+        except Exception as e:
+            print(f"{url}: failed ({e})")
+    print(f"run {pool.run_id}: {pool.stats}")
@@ -1,14 +1,223 @@
 import os
+import queue
+import threading
+import time
 import uuid
+from concurrent.futures import Future
+from urllib.parse import quote
 
 
-def get_connect_options(os_name="linux", run_id=str(uuid.uuid4())) -> tuple[str, dict[str, str]]:
+def get_connect_options(os_name="linux", run_id=None) -> tuple[str, dict[str, str]]:
+    """
+    Endpoint and headers for ``chromium.connect()``.
 
+    The run id groups sessions into one run in the workspace: ``run_id`` if
+    given, else ``PLAYWRIGHT_SERVICE_RUN_ID``, else a new id for this call.
+    """
     service_url = os.getenv("PLAYWRIGHT_SERVICE_URL")
     service_access_token = os.getenv("PLAYWRIGHT_SERVICE_ACCESS_TOKEN")
 
     headers = {"Authorization": f"Bearer {service_access_token}"}
-    service_run_id = os.getenv("PLAYWRIGHT_SERVICE_RUN_ID")
-    ws_endpoint = f"{service_url}?os={os_name}&runId={service_run_id}&api-version=2025-09-01"
+    service_run_id = run_id or os.getenv("PLAYWRIGHT_SERVICE_RUN_ID") or str(uuid.uuid4())
+    ws_endpoint = f"{service_url}?os={os_name}&runId={quote(service_run_id)}&api-version=2025-09-01"
 
-    return ws_endpoint, headers
\ No newline at end of file
+    return ws_endpoint, headers
+
+
+class RemoteBrowserPool:
+    """
+    ``size`` remote browsers, each connected once and kept on its own thread.
+
+    Playwright's sync API objects can only be used on the thread that created
+    them, so every browser lives on a dedicated worker thread with its own
+    ``sync_playwright()``. Work submitted to the pool goes to a shared queue;
+    whichever worker is free runs it on a fresh context of its browser and
+    resolves the returned ``concurrent.futures.Future``. A browser that
+    disconnects is reconnected before its worker's next task. If no worker
+    can start Playwright, queued work fails with the start-up error and
+    ``submit`` raises it.
+
+    All browsers of a pool share one run id (``run_id``, else
+    ``PLAYWRIGHT_SERVICE_RUN_ID``, else a new id per pool), so the pool shows
+    up as one run in the workspace.
+
+    Usage:
+        def title(context, url):
+            page = context.new_page()
+            page.goto(url)
+            return page.title()
+
+        with RemoteBrowserPool(size=8) as pool:
+            for url, title in zip(urls, pool.map(title, urls)):
+                print(url, title)
+    """
+
+    def __init__(self, size=4, os_name="linux", run_id=None, connect_timeout=30000, **context_options):
+        self.size = size
+        self.os_name = os_name
+        self.run_id = run_id or os.getenv("PLAYWRIGHT_SERVICE_RUN_ID") or str(uuid.uuid4())
+        self.connect_timeout = connect_timeout
+        self.context_options = context_options
+        self.stats = {"connects": 0, "reconnects": 0, "tasks": 0, "failures": 0}
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()  # guards stats, _running and the queue once workers die
+        self._threads = []
+        self._running = 0  # workers whose Playwright started (or is starting)
+        self._startup_error = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def start(self):
+        """Start the worker threads; each connects its browser right away."""
+        if self._threads:
+            return
+        with self._lock:
+            self._running = self.size
+            self._startup_error = None
+        for index in range(self.size):
+            thread = threading.Thread(target=self._worker, name=f"remote-browser-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run ``fn(context, *args, **kwargs)`` on a fresh context of one of the browsers."""
+        if not self._threads:
+            self.start()
+        future = Future()
+        with self._lock:
+            if self._running == 0:
+                raise RuntimeError("No remote browser worker could start Playwright") from self._startup_error
+            self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def map(self, fn, *iterables):
+        """
+        Like ``Executor.map``: ``fn(context, *items)`` for each item, results in order.
+
+        Every task is submitted before this returns; the returned iterator
+        only waits for the results.
+        """
+        futures = [self.submit(fn, *items) for items in zip(*iterables)]
+
+        def results():
+            for future in futures:
+                yield future.result()
+
+        return results()
+
+    def shutdown(self, cancel_pending=False, timeout=None):
+        """
+        Finish (or cancel) queued work, then close every browser.
+
+        Blocks until the workers are done, including tasks already running,
+        or for at most ``timeout`` seconds. Workers still busy after the
+        timeout are left to finish on their own (daemon) threads.
+        """
+        if cancel_pending:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+        for thread in self._threads:
+            if thread.is_alive():
+                self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _connect(self, playwright):
+        ws_endpoint, headers = get_connect_options(self.os_name, self.run_id)
+        browser = playwright.chromium.connect(
+            ws_endpoint=ws_endpoint,
+            headers=headers,
+            timeout=self.connect_timeout,
+            expose_network="<loopback>",
+        )
+        self._count("connects")
+        return browser
+
+    def _fail_queued(self, error):
+        """Fail everything still queued; called when the last worker could not start."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(error)
+
+    def _worker(self):
+        from playwright.sync_api import sync_playwright
+
+        try:
+            playwright = sync_playwright().start()
+        except Exception as e:
+            with self._lock:
+                self._running -= 1
+                self._startup_error = e
+                if self._running == 0:
+                    self._fail_queued(e)
+            return
+
+        try:
+            browser = None
+            try:
+                browser = self._connect(playwright)
+            except Exception:
+                pass  # retried before the first task, which then reports the error
+
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                future, fn, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if browser is None or not browser.is_connected():
+                        if browser is not None:
+                            self._count("reconnects")
+                        browser = None
+                        browser = self._connect(playwright)
+                    context = browser.new_context(**self.context_options)
+                    try:
+                        result = fn(context, *args, **kwargs)
+                    finally:
+                        try:
+                            context.close()
+                        except Exception:
+                            pass  # the browser went away; reconnected before the next task
+                except Exception as e:
+                    self._count("failures")
+                    future.set_exception(e)
+                except BaseException as e:
+                    # KeyboardInterrupt/SystemExit end this worker; the finally stops Playwright.
+                    self._count("failures")
+                    future.set_exception(e)
+                    with self._lock:
+                        self._running -= 1
+                        if self._running == 0:
+                            self._fail_queued(RuntimeError("Every remote browser worker has stopped"))
+                    raise
+                else:
+                    self._count("tasks")
+                    future.set_result(result)
+
+            if browser is not None and browser.is_connected():
+                browser.close()
+        finally:
+            playwright.stop()